@@ -130,7 +130,9 @@ class RoomManager:
             room = self.rooms[room_id]
             if room.add_player(player_name):
                 available_colors = room.get_available_colors()
-                return (True, {"action": "join", "name": player_name, "result": "success", "colors": available_colors})
+                # Base for the player's shuffle seeds, so shuffles are described by a seed
+                seed = randint(0, 2 ** 63 - 1)
+                return (True, {"action": "join", "name": player_name, "result": "success", "colors": available_colors, "seed": seed})
             return (False, {
                 "action": "join",
                 "result": "fail",
@@ -0,0 +1,202 @@
+import heapq
+import itertools
+import time
+
+import numpy as np
+
+from random import randint
+
+class Easing:
+    """Easing curves, all written to work on whole arrays of progress values."""
+
+    LINEAR = 0
+    EASE_OUT = 1
+    EASE_IN_OUT = 2
+
+    @staticmethod
+    def apply(easing, t):
+        if easing == Easing.EASE_OUT:
+            return 1 - (1 - t) ** 2
+        if easing == Easing.EASE_IN_OUT:
+            return np.where(t < 0.5, 2 * t * t, 1 - 2 * (1 - t) ** 2)
+        return t
+
+class Animator:
+    """Time-based tweens and scheduled steps.
+
+    Every moving sprite owns one row of the tween arrays; a frame computes
+    all positions with a few array operations and finished rows are removed
+    by moving the last row into their place. One-off steps (such as the
+    phases of a shuffle) go on a timeline heap. Everything is driven by the
+    clock rather than by frame counts, so a slow frame does not slow the
+    animation down."""
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, transform_manager, clock=time.perf_counter):
+        self.transform_manager = transform_manager
+        self.clock = clock
+        self.count = 0
+        self.sprites = []
+        self.callbacks = []
+        self.rows = dict()
+        self.timeline = []
+        self.sequence = itertools.count()
+        self.allocate(Animator.INITIAL_CAPACITY)
+
+    def allocate(self, capacity):
+        def grow(column, shape, dtype):
+            grown = np.zeros(shape, dtype)
+            if column is not None:
+                grown[:len(column)] = column
+            return grown
+        self.start = grow(getattr(self, "start", None), (capacity, 2), np.float64)
+        self.end = grow(getattr(self, "end", None), (capacity, 2), np.float64)
+        self.begin = grow(getattr(self, "begin", None), capacity, np.float64)
+        self.duration = grow(getattr(self, "duration", None), capacity, np.float64)
+        self.easing = grow(getattr(self, "easing", None), capacity, np.int8)
+        self.sprites.extend([None] * (capacity - len(self.sprites)))
+        self.callbacks.extend([None] * (capacity - len(self.callbacks)))
+
+    def move(self, sprite, end_pos, duration, easing=Easing.LINEAR, callback=None, start_pos=None):
+        """Move a sprite's top left corner to `end_pos` over `duration` seconds.
+
+        Starting a new move on a sprite replaces the one it had."""
+        row = self.rows.get(sprite)
+        if row is None:
+            if self.count == len(self.sprites):
+                self.allocate(2 * len(self.sprites))
+            row = self.count
+            self.count += 1
+            self.rows[sprite] = row
+            self.sprites[row] = sprite
+        self.start[row] = start_pos if start_pos is not None else sprite.world_rect.topleft
+        self.end[row] = end_pos
+        self.begin[row] = self.clock()
+        self.duration[row] = max(duration, 1e-6)
+        self.easing[row] = easing
+        self.callbacks[row] = callback
+
+    def schedule(self, delay, fn):
+        """Call `fn()` once `delay` seconds have passed."""
+        heapq.heappush(self.timeline, (self.clock() + delay, next(self.sequence), fn))
+
+    def is_moving(self, sprite):
+        return sprite in self.rows
+
+    def is_idle(self):
+        return self.count == 0 and len(self.timeline) == 0
+
+    def update(self):
+        now = self.clock()
+        while len(self.timeline) > 0 and self.timeline[0][0] <= now:
+            _, _, fn = heapq.heappop(self.timeline)
+            fn()
+
+        n = self.count
+        if n == 0:
+            return
+        t = np.clip((now - self.begin[:n]) / self.duration[:n], 0.0, 1.0)
+        eased = t.copy()
+        for easing in np.unique(self.easing[:n]).tolist():
+            if easing != Easing.LINEAR:
+                mask = self.easing[:n] == easing
+                eased[mask] = Easing.apply(easing, t[mask])
+        positions = self.start[:n] + (self.end[:n] - self.start[:n]) * eased[:, None]
+
+        move_sprite_to = self.transform_manager.move_sprite_to
+        for sprite, (x, y) in zip(self.sprites[:n], positions.tolist()):
+            move_sprite_to(sprite, x, y)
+
+        finished = np.flatnonzero(t >= 1.0).tolist()
+        done = []
+        # Highest rows first, so the rows moved into the gaps are still pending
+        for row in reversed(finished):
+            done.append((self.sprites[row], self.callbacks[row]))
+            self.remove_row(row)
+        for sprite, callback in done:
+            if callback is not None:
+                callback(sprite)
+
+    def remove_row(self, row):
+        last = self.count - 1
+        del self.rows[self.sprites[row]]
+        if row != last:
+            moved = self.sprites[last]
+            self.start[row] = self.start[last]
+            self.end[row] = self.end[last]
+            self.begin[row] = self.begin[last]
+            self.duration[row] = self.duration[last]
+            self.easing[row] = self.easing[last]
+            self.sprites[row] = moved
+            self.callbacks[row] = self.callbacks[last]
+            self.rows[moved] = row
+        self.sprites[last] = None
+        self.callbacks[last] = None
+        self.count = last
+
+class Animations:
+    """The board's animations, built from Animator moves and steps."""
+
+    SHUFFLE_IMAGES = 10
+    SHUFFLE_STEPS = 5
+    SHUFFLE_STEP_SECONDS = 1 / 6
+    RETRIEVE_SECONDS = 0.75
+    ROLL_SECONDS = 5 / 6
+    ROLL_STEP_SECONDS = 1 / 20
+
+    @staticmethod
+    def shuffle(game, holder):
+        """Throw the top cards around the holder a few times, then stack them
+        back."""
+        def random_coordinate():
+            diff_left = int(-holder.world_rect.width * 0.9)
+            diff_right = int(holder.world_rect.width * 0.2)
+            center = holder.world_rect.center
+            return center[0] + randint(diff_left, diff_right), center[1] + randint(diff_left, diff_right)
+
+        top_images = []
+        for _ in range(Animations.SHUFFLE_IMAGES):
+            top_image = holder.pop_image(send_message=False)
+            if top_image is None:
+                break
+            game.transform_manager.move_sprite_to(top_image, *random_coordinate())
+            top_images.append(top_image)
+            game.assign_z_index(top_image)
+
+        def step(last):
+            for image in top_images:
+                dest = holder.world_rect.topleft if last else random_coordinate()
+                game.animator.move(image, dest, Animations.SHUFFLE_STEP_SECONDS)
+
+        def finish():
+            holder.add_images(top_images, False)
+
+        for i in range(Animations.SHUFFLE_STEPS):
+            game.animator.schedule(i * Animations.SHUFFLE_STEP_SECONDS, lambda last=i == Animations.SHUFFLE_STEPS - 1: step(last))
+        game.animator.schedule(Animations.SHUFFLE_STEPS * Animations.SHUFFLE_STEP_SECONDS, finish)
+
+    @staticmethod
+    def retrieve(game, image, holder, callback):
+        game.animator.move(image, holder.screen_rect.topleft, Animations.RETRIEVE_SECONDS, Easing.EASE_OUT, callback,
+                           start_pos=image.screen_rect.topleft)
+
+    @staticmethod
+    def roll(game, dice, result):
+        """Jiggle the dice through random faces, then settle on `result`."""
+        start_rect = dice.world_rect.copy()
+
+        def jiggle():
+            diff_left = int(-start_rect.width * 0.1)
+            diff_right = int(start_rect.width * 0.1)
+            game.transform_manager.move_sprite_to(dice, start_rect.x + randint(diff_left, diff_right), start_rect.y + randint(diff_left, diff_right))
+            dice.set_random()
+
+        def settle():
+            game.transform_manager.move_sprite_to(dice, start_rect.x, start_rect.y)
+            dice.set_specific(result)
+
+        steps = int(Animations.ROLL_SECONDS / Animations.ROLL_STEP_SECONDS)
+        for i in range(1, steps):
+            game.animator.schedule(i * Animations.ROLL_STEP_SECONDS, jiggle)
+        game.animator.schedule(Animations.ROLL_SECONDS, settle)
@@ -0,0 +1,205 @@
+import os
+import queue
+import threading
+import time
+
+import pygame
+
+from contextlib import contextmanager
+from functools import lru_cache
+
+class AssetLoader:
+    """Decodes and scales images on a pool of worker threads.
+
+    Workers only produce raw RGBA buffers, straight from the disk cache when
+    it has them; surfaces are created on the game thread in `process`, which
+    then refreshes every sprite that was waiting on the texture. While a
+    progressive load is running sprites get a stand-in instead of blocking
+    on the decode: the nearest size of the same asset that is already
+    cached, or a cheap placeholder.
+
+    After a zoom, `prescale` walks the board a little every frame and queues
+    the sizes for the neighbouring zoom levels at the lowest priority, so the
+    next wheel step usually finds its textures ready."""
+
+    PRIORITY_VISIBLE_FRONT = 0
+    PRIORITY_VISIBLE = 1
+    PRIORITY_OFFSCREEN = 2
+    PRIORITY_HIDDEN = 3
+    PRIORITY_PRESCALE = 4
+
+    PLACEHOLDER_COLOR = (200, 200, 200)
+    PLACEHOLDER_BORDER_COLOR = (150, 150, 150)
+
+    def __init__(self, assets, camera, workers=None):
+        self.assets = assets
+        self.camera = camera
+        self.waiting = dict()
+        self.waiters = dict()
+        # Key -> priority it is queued at; stale heap entries are skipped
+        self.queued = dict()
+        self.standins = dict()
+        self.view = None
+        self.prescaling = None
+        self.loading = False
+        self.requests = queue.PriorityQueue()
+        self.finished = queue.SimpleQueue()
+        self.counter = 0
+        self.workers = []
+        for _ in range(workers or os.cpu_count() or 1):
+            worker = threading.Thread(target=self.work, daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    @contextmanager
+    def progressive(self):
+        """Sprites updated inside the block are queued instead of decoded.
+
+        Requests are only handed to the workers when the block exits, so the
+        priorities reflect each sprite's final state (face, visibility)."""
+        self.loading = True
+        self.view = None
+        try:
+            yield
+        finally:
+            self.loading = False
+            self.submit_waiting()
+
+    def display_for(self, sprite, image_path, width, height):
+        """Return the texture if it is ready, a stand-in while it is being
+        loaded, or None when the caller should decode it synchronously."""
+        key = (image_path, width, height)
+        surface = self.assets.lookup(image_path, width, height)
+        if surface is None and (self.loading or self.queued.get(key, AssetLoader.PRIORITY_PRESCALE) < AssetLoader.PRIORITY_PRESCALE):
+            self.wait(sprite, key)
+            return self.stand_in(sprite, key)
+        self.stop_waiting(sprite)
+        return surface
+
+    def stand_in(self, sprite, key):
+        """Nearest cached size scaled on the fly for sprites in view, the
+        placeholder for everything else."""
+        surface = self.standins.get(key)
+        if surface is not None:
+            return surface
+        image_path, width, height = key
+        if self.view is None:
+            self.view = self.camera.view_rect()
+        if self.view.colliderect(sprite.world_rect):
+            nearest = self.assets.nearest(image_path, width, height)
+            if nearest is not None:
+                surface = self.standins[key] = pygame.transform.scale(nearest, (width, height))
+                return surface
+        return AssetLoader.placeholder(width, height)
+
+    def wait(self, sprite, key):
+        if self.waiting.get(sprite) != key:
+            self.stop_waiting(sprite)
+            self.waiting[sprite] = key
+            self.waiters.setdefault(key, set()).add(sprite)
+
+    def is_waiting(self, sprite):
+        """Whether the sprite is showing a stand-in for its texture."""
+        return sprite in self.waiting
+
+    def stop_waiting(self, sprite):
+        key = self.waiting.pop(sprite, None)
+        if key is not None:
+            self.waiters[key].discard(sprite)
+
+    def priority(self, sprite, image_path, display_rect):
+        if not sprite.render:
+            return AssetLoader.PRIORITY_HIDDEN
+        x, y = self.camera.apply_zoom(*self.camera.apply_rotation(*sprite.world_rect.topleft))
+        size = max(sprite.screen_rect.width, sprite.screen_rect.height)
+        if not display_rect.colliderect((x - size, y - size, 2 * size, 2 * size)):
+            return AssetLoader.PRIORITY_OFFSCREEN
+        if getattr(sprite, "back_image_path", None) == image_path:
+            return AssetLoader.PRIORITY_VISIBLE
+        return AssetLoader.PRIORITY_VISIBLE_FRONT
+
+    def submit_waiting(self):
+        display_rect = pygame.display.get_surface().get_rect()
+        priorities = dict()
+        for key, sprites in self.waiters.items():
+            queued = self.queued.get(key, AssetLoader.PRIORITY_PRESCALE)
+            if len(sprites) == 0 or queued < AssetLoader.PRIORITY_PRESCALE:
+                continue
+            best = AssetLoader.PRIORITY_HIDDEN
+            for sprite in sprites:
+                best = min(best, self.priority(sprite, key[0], display_rect))
+                if best == AssetLoader.PRIORITY_VISIBLE_FRONT:
+                    break
+            priorities[key] = best
+        for key, priority in sorted(priorities.items(), key=lambda item: item[1]):
+            self.enqueue(key, priority)
+
+    def enqueue(self, key, priority):
+        self.queued[key] = priority
+        self.counter += 1
+        self.requests.put((priority, self.counter, key))
+
+    def prescale(self, sprites, scales):
+        """Schedule every texture in `sprites` at each of `scales`."""
+        self.prescaling = self.prescale_keys(list(sprites), scales)
+
+    def prescale_keys(self, sprites, scales):
+        # Assigning through a Rect rounds the same way Camera.zoom does
+        size = pygame.Rect(0, 0, 0, 0)
+        for scale in scales:
+            for sprite in sprites:
+                if hasattr(sprite, "texture_path"):
+                    size.width = sprite.world_rect.width * scale
+                    size.height = sprite.world_rect.height * scale
+                    yield (sprite.texture_path(), size.width, size.height)
+
+    def work(self):
+        while True:
+            priority, _, key = self.requests.get()
+            if self.queued.get(key) != priority:
+                continue
+            image_path, width, height = key
+            try:
+                self.finished.put((key, self.assets.scaled_pixels(image_path, width, height)))
+            except (OSError, KeyError, pygame.error) as e:
+                print(f"Failed to load {image_path}: {e}")
+                self.finished.put((key, None))
+
+    def process(self, budget_ms=4):
+        """Turn finished buffers into surfaces, within a per-frame time budget."""
+        deadline = time.perf_counter() + budget_ms / 1000
+        while time.perf_counter() < deadline:
+            try:
+                key, buffer = self.finished.get_nowait()
+            except queue.Empty:
+                break
+            self.queued.pop(key, None)
+            self.standins.pop(key, None)
+            if buffer is not None:
+                image_path, width, height = key
+                self.assets.store_scaled(image_path, width, height, pygame.image.frombuffer(buffer, (width, height), "RGBA").convert_alpha())
+            for sprite in self.waiters.pop(key, ()):
+                del self.waiting[sprite]
+                sprite.invalidate()
+                sprite.update()
+        if self.prescaling is not None:
+            self.submit_prescale(deadline)
+
+    def submit_prescale(self, deadline):
+        for i, key in enumerate(self.prescaling):
+            if key not in self.queued and not self.assets.has_scaled(*key):
+                self.enqueue(key, AssetLoader.PRIORITY_PRESCALE)
+            if i % 64 == 63 and time.perf_counter() >= deadline:
+                return
+        self.prescaling = None
+
+    def is_idle(self):
+        return len(self.queued) == 0
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def placeholder(width, height):
+        surface = pygame.Surface((width, height))
+        surface.fill(AssetLoader.PLACEHOLDER_COLOR)
+        pygame.draw.rect(surface, AssetLoader.PLACEHOLDER_BORDER_COLOR, surface.get_rect(), max(1, width // 30))
+        return surface
@@ -0,0 +1,274 @@
+import hashlib
+import io
+import mmap
+import os
+import struct
+import threading
+import zipfile
+
+import pygame
+
+from collections import OrderedDict
+
+class AssetStats:
+    """Cache counters for a single asset path."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+        self.bytes = 0
+
+    def __repr__(self):
+        return f"AssetStats(hits={self.hits}, misses={self.misses}, decodes={self.decodes}, bytes={self.bytes})"
+
+class AssetManager:
+    """Serves asset bytes straight out of mounted game archives and caches
+    the surfaces made from them.
+
+    Nothing is extracted; the filesystem is only used as a fallback for
+    paths no archive contains, or when an asset is explicitly persisted.
+
+    Every path is decoded once into an original surface, and scaled variants
+    are derived from that original in memory. Originals, variants and
+    rotated copies of variants share a byte budget; least recently used
+    rotations are evicted first, then variants, then originals, which are
+    only needed to derive new sizes. With a
+    `disk_cache` (a SurfaceCache) scaled pixels also survive across sessions
+    and warm starts never decode at all."""
+
+    DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, disk_cache=None):
+        self.archives = []
+        self.disk_cache = disk_cache
+        self.file_hashes = dict()
+        self.budget_bytes = budget_bytes
+        self.bytes_used = 0
+        self.originals = OrderedDict()
+        self.scaled = OrderedDict()
+        self.rotations = OrderedDict()
+        self.sizes = dict()
+        self.stats = dict()
+        # Originals may be decoded from loader threads as well
+        self.lock = threading.RLock()
+        self.decode_locks = dict()
+
+    def mount_archive(self, source):
+        """Mount a zip given either as a path or as its raw bytes."""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        archive = zipfile.ZipFile(source, "r")
+        # Most recently mounted archive shadows older ones
+        self.archives.insert(0, archive)
+        return archive
+
+    def find_archive(self, path):
+        for archive in self.archives:
+            if path in archive.NameToInfo:
+                return archive
+        return None
+
+    def read(self, path):
+        archive = self.find_archive(path)
+        if archive is not None:
+            return archive.read(path)
+        with open(path, "rb") as f:
+            return f.read()
+
+    def open(self, path):
+        archive = self.find_archive(path)
+        if archive is not None:
+            return archive.open(path)
+        return open(path, "rb")
+
+    def map_member(self, archive, name):
+        """Memory-map a stored member of a file-backed archive.
+
+        Falls back to reading the member when it is compressed or the archive
+        lives in memory anyway."""
+        info = archive.getinfo(name)
+        if info.compress_type != zipfile.ZIP_STORED or not isinstance(archive.filename, str) or info.file_size == 0:
+            return archive.read(name)
+        with open(archive.filename, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Local file header: 30 fixed bytes, then the name and extra field
+        name_length, extra_length = struct.unpack_from("<HH", mapped, info.header_offset + 26)
+        start = info.header_offset + 30 + name_length + extra_length
+        return memoryview(mapped)[start:start + info.file_size]
+
+    def load_image(self, path):
+        with self.open(path) as f:
+            return pygame.image.load(f, path)
+
+    def content_hash(self, path):
+        """Identify the bytes behind `path`, or None if it does not exist."""
+        archive = self.find_archive(path)
+        if archive is not None:
+            # The disk cache serves pixels by this key alone, so a real
+            # digest rather than the member's CRC; archives are read-only
+            # once mounted, so each member is hashed once
+            key = (archive, path)
+            cached = self.file_hashes.get(key)
+            if cached is None:
+                cached = self.file_hashes[key] = hashlib.sha1(archive.read(path)).hexdigest()
+            return cached
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        cached = self.file_hashes.get(path)
+        if cached is None or cached[0] != (stat.st_mtime_ns, stat.st_size):
+            with open(path, "rb") as f:
+                cached = self.file_hashes[path] = ((stat.st_mtime_ns, stat.st_size), hashlib.sha1(f.read()).hexdigest())
+        return cached[1]
+
+    def stats_for(self, path):
+        stats = self.stats.get(path)
+        if stats is None:
+            stats = self.stats[path] = AssetStats()
+        return stats
+
+    def get_original(self, path):
+        """Decoded surface for `path`, decoded at most once while cached.
+
+        Safe to call from worker threads, the surface is not converted to the
+        display format since it is only ever used as a scaling source."""
+        with self.lock:
+            original = self.originals.get(path)
+            if original is not None:
+                self.originals.move_to_end(path)
+                return original
+            decode_lock = self.decode_locks.setdefault(path, threading.Lock())
+        with decode_lock:
+            with self.lock:
+                original = self.originals.get(path)
+                if original is not None:
+                    return original
+            original = AssetManager.to_rgba(self.load_image(path))
+            with self.lock:
+                self.stats_for(path).decodes += 1
+                self.originals[path] = original
+                self.account(path, original, 1)
+                self.evict()
+            return original
+
+    def lookup(self, path, width, height):
+        """Return a cached scaled variant or None, without creating one."""
+        with self.lock:
+            surface = self.scaled.get((path, width, height))
+            if surface is not None:
+                self.scaled.move_to_end((path, width, height))
+                self.stats_for(path).hits += 1
+            return surface
+
+    def has_scaled(self, path, width, height):
+        return (path, width, height) in self.scaled
+
+    def get_scaled(self, path, width, height):
+        """Return `path` scaled to the size, ready to blit."""
+        surface = self.lookup(path, width, height)
+        if surface is not None:
+            return surface
+        pixels = self.scaled_pixels(path, width, height)
+        scaled = pygame.image.frombuffer(pixels, (width, height), "RGBA").convert_alpha()
+        return self.store_scaled(path, width, height, scaled)
+
+    def scaled_pixels(self, path, width, height):
+        """RGBA bytes of `path` at the size, read from the disk cache when
+        possible. Safe to call from worker threads."""
+        content_hash = self.content_hash(path) if self.disk_cache is not None else None
+        if content_hash is not None:
+            pixels = self.disk_cache.load(content_hash, width, height)
+            if pixels is not None:
+                return pixels
+        original = self.get_original(path)
+        pixels = pygame.image.tobytes(pygame.transform.smoothscale(original, (width, height)), "RGBA")
+        if content_hash is not None:
+            self.disk_cache.store(content_hash, width, height, pixels)
+        return pixels
+
+    def store_scaled(self, path, width, height, surface):
+        """Add a variant produced elsewhere, e.g. by the AssetLoader."""
+        with self.lock:
+            key = (path, width, height)
+            previous = self.scaled.pop(key, None)
+            if previous is not None:
+                self.account(path, previous, -1)
+            self.stats_for(path).misses += 1
+            self.scaled[key] = surface
+            self.sizes.setdefault(path, set()).add((width, height))
+            self.account(path, surface, 1)
+            self.evict()
+            return surface
+
+    def get_rotated(self, path, width, height, rotation, surface):
+        """`surface`, the variant of `path` at the size, rotated by `rotation` degrees."""
+        key = (path, width, height, rotation)
+        with self.lock:
+            rotated = self.rotations.get(key)
+            if rotated is not None:
+                self.rotations.move_to_end(key)
+                return rotated
+        rotated = pygame.transform.rotate(surface, rotation)
+        with self.lock:
+            self.rotations[key] = rotated
+            self.account(path, rotated, 1)
+            self.evict()
+        return rotated
+
+    def nearest(self, path, width, height):
+        """Closest cached variant of `path` in any size, preferring larger ones
+        since shrinking them looks better. None if nothing is cached."""
+        with self.lock:
+            sizes = self.sizes.get(path)
+            if not sizes:
+                return None
+            size = min(sizes, key=lambda size: (abs(size[0] - width), size[0] < width))
+            return self.scaled[(path, *size)]
+
+    def account(self, path, surface, sign):
+        size = surface.get_width() * surface.get_height() * surface.get_bytesize() * sign
+        self.bytes_used += size
+        self.stats_for(path).bytes += size
+
+    def evict(self):
+        while self.bytes_used > self.budget_bytes and len(self.rotations) > 0:
+            (path, _, _, _), surface = self.rotations.popitem(last=False)
+            self.account(path, surface, -1)
+        while self.bytes_used > self.budget_bytes and len(self.scaled) > 0:
+            (path, width, height), surface = self.scaled.popitem(last=False)
+            self.sizes[path].discard((width, height))
+            self.account(path, surface, -1)
+        while self.bytes_used > self.budget_bytes and len(self.originals) > 0:
+            path, surface = self.originals.popitem(last=False)
+            self.account(path, surface, -1)
+
+    def set_budget(self, budget_bytes):
+        with self.lock:
+            self.budget_bytes = budget_bytes
+            self.evict()
+
+    def hit_rate(self):
+        # Loader threads add per-path stats while this runs on the game thread
+        with self.lock:
+            hits = sum(stats.hits for stats in self.stats.values())
+            misses = sum(stats.misses for stats in self.stats.values())
+        return hits / (hits + misses) if hits + misses > 0 else 0.0
+
+    @staticmethod
+    def to_rgba(image):
+        """Widen palette images to 32 bits, which smoothscale requires."""
+        if image.get_bitsize() in (24, 32):
+            return image
+        rgba = pygame.Surface(image.get_size(), pygame.SRCALPHA, 32)
+        rgba.blit(image, (0, 0))
+        return rgba
+
+    def persist(self, path, directory="."):
+        """Write a single asset to disk and return where it ended up."""
+        destination = os.path.join(directory, path)
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        with open(destination, "wb") as f:
+            f.write(self.read(path))
+        return destination
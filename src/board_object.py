@@ -2,8 +2,24 @@ from pygame.sprite import Sprite
 
 class BoardObject(Sprite):
 
+    LAYER_BOARD = 0
+    # Drawn above every board object regardless of z index
+    LAYER_OVERLAY = 1
+    # Sprites whose display only changes through explicit update() calls
+    # can opt out of the per-frame SpriteGroup.update pass
+    UPDATE_EVERY_FRAME = True
+
     def __init__(self, group):
+        # Set before joining the group, which reads them to order the sprite
+        self._render = False
+        self._z_index = 0
+        self._layer = BoardObject.LAYER_BOARD
+        self._add_order = 0
         super().__init__(group)
+        self.display_stale = True
+        self.display_key = None
+        # (path, width, height) when the display is that loaded texture
+        self.texture_key = None
         self.static_rendering = False
         self.is_focused = False
         self.draggable = False
@@ -12,7 +28,74 @@ class BoardObject(Sprite):
         self.z_index = 0
         self.rotation = 0
 
+    @property
+    def render(self):
+        return self._render
+
+    @render.setter
+    def render(self, render):
+        if self._render != render:
+            self._render = render
+            self.order_changed()
+
+    @property
+    def z_index(self):
+        return self._z_index
+
+    @z_index.setter
+    def z_index(self, z_index):
+        if self._z_index != z_index:
+            self._z_index = z_index
+            self.order_changed()
+
+    @property
+    def layer(self):
+        return self._layer
+
+    @layer.setter
+    def layer(self, layer):
+        if self._layer != layer:
+            self._layer = layer
+            self.order_changed()
+
+    def order_key(self):
+        return (self._layer, self._z_index, self._add_order)
+
+    def order_changed(self):
+        for group in self.groups():
+            group.sprite_order_changed(self)
+
+    def geometry_changed(self):
+        """Call after moving or resizing world_rect."""
+        for group in self.groups():
+            group.sprite_geometry_changed(self)
+
     def update(self):
+        for group in self.groups():
+            if group.defer_update(self):
+                return
+        self.refresh_display()
+
+    def batch(self):
+        """Game.batch() for objects that operate on several others."""
+        return self.game.batch()
+
+    def display_inputs(self):
+        """Whatever create_display reads that can change without a call to
+        invalidate(). The display is rebuilt whenever this value changes."""
+        return None
+
+    def invalidate(self):
+        self.display_stale = True
+
+    def refresh_display(self):
+        display_key = self.display_inputs()
+        if self.display_stale or display_key != self.display_key:
+            self.display_stale = False
+            self.display_key = display_key
+            self.create_display()
+
+    def create_display(self):
         pass
 
     def clicked(self):
@@ -31,8 +114,7 @@ class BoardObject(Sprite):
     def mark_focused(self, is_focused):
         if self.is_focused != is_focused:
             self.is_focused = is_focused
-            self.create_display()
+            self.invalidate()
 
     def release(self):
         pass
-
@@ -1,6 +1,7 @@
 import pygame
 from src.board_object import BoardObject
-from src.ongoing import OngoingShuffle, OngoingMove
+from src.text_cache import TextCache
+from src.animation import Animations
 
 class Button(BoardObject):
     def __init__(self, group, game, text, x, y, width, height, font_size=25):
@@ -13,7 +14,10 @@ class Button(BoardObject):
         self.screen_rect = pygame.rect.Rect(x, y, width, height)
         self.world_rect = self.screen_rect.copy()
         self.font_size = font_size
-        self.create_display()
+        self.refresh_display()
+
+    def display_inputs(self):
+        return (self.screen_rect.size, self.is_focused, self.text, self.font_size)
 
     def create_display(self):
         text_color = (0, 0, 0)
@@ -28,8 +32,7 @@ class Button(BoardObject):
         pygame.draw.rect(surface, border_color, (0, 0, self.screen_rect.width, self.screen_rect.height), 
                          width=border_thickness, border_radius=7)
 
-        font = pygame.font.Font(None, self.font_size)
-        text_surface = font.render(self.text, True, text_color)
+        text_surface = TextCache.render(self.text, self.font_size, text_color)
         text_rect = text_surface.get_rect(center=(self.screen_rect.width / 2, self.screen_rect.height / 2))
         surface.blit(text_surface, text_rect)
 
@@ -44,9 +47,6 @@ class Button(BoardObject):
     def clicked(self):
         pass
 
-    def update(self):
-        self.create_display()
-
 class ShuffleButton(Button):
 
     def __init__(self, group, game, x, y, width, height, holder, font_size=25):
@@ -56,14 +56,14 @@ class ShuffleButton(Button):
         self._type = "shuffle_button"
 
     def clicked(self):
-        self.game.network_mg.shuffle_button_clicked_send(self)
         self.shuffle()
 
-    def shuffle(self):
-        self.holder.shuffle()
+    def shuffle(self, seed=None, send_message=True):
+        seed = self.holder.shuffle(seed, False)
+        if send_message:
+            self.game.network_mg.shuffle_button_clicked_send(self, seed)
         # Animation
-        ongoing_shuffle = OngoingShuffle(self.holder, self.game)
-        self.game.add_ongoing(ongoing_shuffle)
+        Animations.shuffle(self.game, self.holder)
 
 class SitButton(Button):
 
@@ -95,12 +95,12 @@ class RetrieveButton(Button):
         self.retrieve()
 
     def retrieve(self):
-        for image in self.images_to_retrieve:
-            if hasattr(self.game, "player_hand") and image in self.game.player_hand.deck:
-                self.game.player_hand.remove_image(image)
-            if image not in self.deck.deck:
-                def callback(image):
-                    image.assign_front(False)
-                    self.deck.add_image(image, send_message=False)
-                ongoing_event = OngoingMove(image.screen_rect.topleft, self.deck.screen_rect.topleft, 45, image, self.game, callback)
-                self.game.add_ongoing(ongoing_event)
+        with self.batch():
+            for image in self.images_to_retrieve:
+                if hasattr(self.game, "player_hand") and image in self.game.player_hand.deck:
+                    self.game.player_hand.remove_image(image)
+                if image not in self.deck.deck:
+                    def callback(image):
+                        image.assign_front(False)
+                        self.deck.add_image(image, send_message=False)
+                    Animations.retrieve(self.game, image, self.deck, callback)
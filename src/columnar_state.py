@@ -0,0 +1,202 @@
+import struct
+import sys
+from array import array
+
+class ColumnarState:
+    """Compact binary alternative to game_state.json.
+
+    Objects are stored as typed columns rather than per-object dicts:
+
+        header   magic, version, object/string/list-value counts
+        strings  uint32 offsets into a UTF-8 blob (asset paths)
+        columns  id, x, y, width, height, z_index, flags, type,
+                 front asset, back asset, reference, list offsets
+        lists    int32 values for decks, retrieve lists and dice faces
+
+    Every section starts on an 8 byte boundary and is little-endian, so a
+    memory-mapped file can be read through memoryview casts without copying.
+    """
+
+    MAGIC = b"BSXC"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHIII")
+
+    TYPES = ("image", "holder", "player_hand", "shuffle_button", "retrieve_button", "sit_button", "dice")
+
+    FLAG_RENDER = 1
+    FLAG_FLIPABLE = 2
+    FLAG_DRAGGABLE = 4
+    FLAG_ROTATABLE = 8
+    FLAG_IS_FRONT = 16
+    ROTATION_SHIFT = 5
+
+    @staticmethod
+    def encode(game_state):
+        strings = dict()
+        def string_index(value):
+            if value is None:
+                return -1
+            return strings.setdefault(value, len(strings))
+
+        count = len(game_state)
+        ids, xs, ys, widths, heights = (array("i", bytes(4 * count)) for _ in range(5))
+        z_indexes = array("q", bytes(8 * count))
+        flags = array("H", bytes(2 * count))
+        types = array("B", bytes(count))
+        front_assets, back_assets, refs = (array("i", [-1]) * count for _ in range(3))
+        list_offsets = array("I", [0])
+        list_values = array("i")
+
+        for i, record in enumerate(game_state):
+            _type = record["type"]
+            ids[i] = record["id"]
+            xs[i] = record["x"]
+            ys[i] = record["y"]
+            widths[i] = record["width"]
+            heights[i] = record["height"]
+            z_indexes[i] = record.get("z_index", 0)
+            types[i] = ColumnarState.TYPES.index(_type)
+            f = ColumnarState.FLAG_RENDER if record.get("render", True) else 0
+            if record.get("flipable"):
+                f |= ColumnarState.FLAG_FLIPABLE
+            if record.get("draggable"):
+                f |= ColumnarState.FLAG_DRAGGABLE
+            if record.get("rotatable"):
+                f |= ColumnarState.FLAG_ROTATABLE
+            if record.get("is_front"):
+                f |= ColumnarState.FLAG_IS_FRONT
+            f |= (record.get("rotation", 0) // 90 % 4) << ColumnarState.ROTATION_SHIFT
+            flags[i] = f
+
+            if _type == "image":
+                front_assets[i] = string_index(record["front_path"])
+                back_assets[i] = string_index(record.get("back_path"))
+            elif _type == "holder":
+                list_values.extend(record["deck"])
+            elif _type == "retrieve_button":
+                refs[i] = record["holder"]
+                list_values.extend(record["images_to_retrieve"])
+            elif _type == "shuffle_button":
+                refs[i] = record["holder"]
+            elif _type == "sit_button":
+                refs[i] = record["hand"]
+            elif _type == "dice":
+                list_values.extend(string_index(p) for p in record["paths"])
+            list_offsets.append(len(list_values))
+
+        blob = bytearray()
+        string_offsets = array("I", [0])
+        for value in strings:
+            blob += value.encode("utf-8")
+            string_offsets.append(len(blob))
+
+        sections = [string_offsets, blob, ids, xs, ys, widths, heights, z_indexes, flags, types,
+                    front_assets, back_assets, refs, list_offsets, list_values]
+        out = bytearray(ColumnarState.HEADER.pack(ColumnarState.MAGIC, ColumnarState.VERSION, 0,
+                                                  count, len(strings), len(list_values)))
+        for section in sections:
+            out += bytes(-len(out) % 8)
+            if isinstance(section, array):
+                if sys.byteorder == "big" and section.itemsize > 1:
+                    section = array(section.typecode, section)
+                    section.byteswap()
+                section = section.tobytes()
+            out += section
+        return bytes(out)
+
+    @staticmethod
+    def columns(buffer):
+        """Return the raw columns of an encoded state as memoryviews into `buffer`."""
+        view = memoryview(buffer).cast("B")
+        magic, version, _, count, string_count, list_count = ColumnarState.HEADER.unpack_from(view, 0)
+        if magic != ColumnarState.MAGIC:
+            raise ValueError("Not a columnar game state")
+        if version > ColumnarState.VERSION:
+            raise ValueError(f"Unsupported columnar game state version {version}")
+
+        offset = ColumnarState.HEADER.size
+        def take(typecode, length):
+            nonlocal offset
+            offset += -offset % 8
+            size = struct.calcsize(typecode) * length
+            section = view[offset:offset + size]
+            offset += size
+            if typecode == "s":
+                return section
+            if sys.byteorder == "big" and typecode not in "Bs":
+                swapped = array(typecode, section.tobytes())
+                swapped.byteswap()
+                return memoryview(swapped)
+            return section.cast(typecode)
+
+        string_offsets = take("I", string_count + 1)
+        blob = take("s", string_offsets[-1])
+        columns = {
+            "strings": [bytes(blob[string_offsets[i]:string_offsets[i + 1]]).decode("utf-8") for i in range(string_count)],
+            "id": take("i", count),
+            "x": take("i", count),
+            "y": take("i", count),
+            "width": take("i", count),
+            "height": take("i", count),
+            "z_index": take("q", count),
+            "flags": take("H", count),
+            "type": take("B", count),
+            "front_asset": take("i", count),
+            "back_asset": take("i", count),
+            "ref": take("i", count),
+            "list_offsets": take("I", count + 1),
+            "list_values": take("i", list_count),
+        }
+        return columns
+
+    @staticmethod
+    def decode(buffer):
+        """Expand an encoded state into the same records game_state.json holds."""
+        c = ColumnarState.columns(buffer)
+        strings = c["strings"]
+        ids, xs, ys, widths, heights = c["id"].tolist(), c["x"].tolist(), c["y"].tolist(), c["width"].tolist(), c["height"].tolist()
+        z_indexes, flags, types = c["z_index"].tolist(), c["flags"].tolist(), c["type"].tolist()
+        front_assets, back_assets, refs = c["front_asset"].tolist(), c["back_asset"].tolist(), c["ref"].tolist()
+        list_offsets, list_values = c["list_offsets"].tolist(), c["list_values"].tolist()
+
+        game_state = []
+        for i in range(len(ids)):
+            _type = ColumnarState.TYPES[types[i]]
+            f = flags[i]
+            values = list_values[list_offsets[i]:list_offsets[i + 1]]
+            record = {
+                "type": _type,
+                "id": ids[i],
+                "x": xs[i],
+                "y": ys[i],
+                "width": widths[i],
+                "height": heights[i],
+            }
+            if _type != "player_hand":
+                record["z_index"] = z_indexes[i]
+            if _type == "image":
+                record["front_path"] = strings[front_assets[i]]
+                record["render"] = bool(f & ColumnarState.FLAG_RENDER)
+                record["flipable"] = bool(f & ColumnarState.FLAG_FLIPABLE)
+                record["draggable"] = bool(f & ColumnarState.FLAG_DRAGGABLE)
+                record["rotatable"] = bool(f & ColumnarState.FLAG_ROTATABLE)
+                record["is_front"] = bool(f & ColumnarState.FLAG_IS_FRONT)
+                record["rotation"] = (f >> ColumnarState.ROTATION_SHIFT & 3) * 90
+                if back_assets[i] != -1:
+                    record["back_path"] = strings[back_assets[i]]
+            elif _type == "holder":
+                record["deck"] = values
+            elif _type == "retrieve_button":
+                record["holder"] = refs[i]
+                record["images_to_retrieve"] = values
+            elif _type == "shuffle_button":
+                record["holder"] = refs[i]
+            elif _type == "sit_button":
+                record["hand"] = refs[i]
+            elif _type == "dice":
+                record["paths"] = [strings[v] for v in values]
+                record["draggable"] = bool(f & ColumnarState.FLAG_DRAGGABLE)
+                record["rotatable"] = bool(f & ColumnarState.FLAG_ROTATABLE)
+                record["rotation"] = (f >> ColumnarState.ROTATION_SHIFT & 3) * 90
+            game_state.append(record)
+        return game_state
@@ -1,41 +1,50 @@
 import pygame
 
+from functools import lru_cache
 from src.board_object import BoardObject
 
 class Cursor(BoardObject):
     """Represents a cursor in the game."""
+
+    UPDATE_EVERY_FRAME = False
+
     def __init__(self, name, color, group, game):
         super().__init__(group)
         self.name = name
         self.color = self.hex_to_rgb(color)
         self.game = game
         self.group = group
-        self.z_index = float('inf')
+        self.layer = BoardObject.LAYER_OVERLAY
         self.render = True
         self._type = "cursor"
         self.rotation = 0
 
-        self.cursor_image = pygame.image.load("cursor.svg").convert_alpha()
-
         self.size = (15, 20)
         self.world_rect = pygame.Rect(0, 0, *self.size)
         self.screen_rect = pygame.Rect(0, 0, *self.size)
 
         self.update()
 
-    def update(self):
-        self.display = pygame.Surface(self.size, pygame.SRCALPHA)
-        scaled_cursor = pygame.transform.smoothscale(self.cursor_image, self.size)
-        self.display.blit(scaled_cursor, (0, 0))
-        self.apply_color_to_surface(self.display, self.color)
-
-    def apply_color_to_surface(self, surface, color):
-        w, h = surface.get_size()
-        r, g, b = color
-        for x in range(w):
-            for y in range(h):
-                a = surface.get_at((x, y))[3]
-                surface.set_at((x, y), (r, g, b, a))
+    def display_inputs(self):
+        # Drawn at a fixed screen size, so zooming does not change it
+        return (self.color, self.size)
+
+    def create_display(self):
+        self.display = Cursor.tinted(self.color, self.size)
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def cursor_image():
+        return pygame.image.load("cursor.svg").convert_alpha()
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def tinted(color, size):
+        """The cursor shape filled with `color`, keeping its alpha."""
+        surface = pygame.transform.smoothscale(Cursor.cursor_image(), size)
+        surface.fill((255, 255, 255), special_flags=pygame.BLEND_RGB_MAX)
+        surface.fill(color, special_flags=pygame.BLEND_RGB_MULT)
+        return surface
 
     def hex_to_rgb(self, hex_color):
         """Convert hex color to RGB."""
@@ -0,0 +1,77 @@
+import zlib
+
+class Deck:
+    """Ordered stack of images, bottom first.
+
+    Backed by an insertion-ordered dict, so membership, appending, popping
+    the top and removing an image from the middle are all constant time.
+
+    Shuffles are reproducible from a seed: the canonical ordering (cards by
+    id) is permuted by a Fisher-Yates shuffle driven by splitmix64, which
+    does not depend on the local order or on Python's own generator. Bump
+    SHUFFLE_VERSION whenever that algorithm changes."""
+
+    SHUFFLE_VERSION = 1
+    MASK = (1 << 64) - 1
+
+    def __init__(self, images=()):
+        self.images = dict.fromkeys(images)
+
+    def __len__(self):
+        return len(self.images)
+
+    def __contains__(self, image):
+        return image in self.images
+
+    def __iter__(self):
+        return iter(self.images)
+
+    def __reversed__(self):
+        return reversed(self.images)
+
+    def __getitem__(self, index):
+        if index == -1 and len(self.images) > 0:
+            return next(reversed(self.images))
+        return list(self.images)[index]
+
+    def top(self):
+        return next(reversed(self.images), None)
+
+    def append(self, image):
+        self.images[image] = None
+
+    def extend(self, images):
+        self.images.update(dict.fromkeys(images))
+
+    def pop(self):
+        return self.images.popitem()[0]
+
+    def remove(self, image):
+        del self.images[image]
+
+    def reorder(self, images):
+        self.images = dict.fromkeys(images)
+
+    def canonical(self):
+        return sorted(self.images, key=lambda image: image._id)
+
+    def seeded_order(self, seed):
+        canonical = self.canonical()
+        return [canonical[i] for i in Deck.permutation(len(canonical), seed)]
+
+    def checksum(self):
+        return zlib.crc32(",".join(str(image._id) for image in self.images).encode())
+
+    @staticmethod
+    def permutation(n, seed):
+        order = list(range(n))
+        state = seed & Deck.MASK
+        for i in range(n - 1, 0, -1):
+            state = (state + 0x9E3779B97F4A7C15) & Deck.MASK
+            z = state
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & Deck.MASK
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & Deck.MASK
+            z ^= z >> 31
+            j = z % (i + 1)
+            order[i], order[j] = order[j], order[i]
+        return order
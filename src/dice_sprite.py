@@ -1,13 +1,14 @@
 import pygame
 import random
 
-from functools import lru_cache
-from src.ongoing import OngoingRoll
+from src.animation import Animations
 from src.board_object import BoardObject
 
 class Dice(BoardObject):
-
     """Represents a dice in the game."""
+
+    UPDATE_EVERY_FRAME = False
+
     def __init__(self, paths, x, y, width, height, group, game, draggable=True, rotatable=True):
         super().__init__(group)
         self.game = game
@@ -26,15 +27,16 @@ class Dice(BoardObject):
 
         self.update()
 
-    def update(self):
-        self.display = Dice.create_display(self.current_image_path, self.screen_rect.width, self.screen_rect.height, self.rotation)
+    def texture_path(self):
+        return self.current_image_path
+
+    def display_inputs(self):
+        return (self.current_image_path, self.screen_rect.size)
 
-    @staticmethod
-    @lru_cache(maxsize=4096)
-    def create_display(image_path, width, height, rotation):
-        image = pygame.image.load(image_path).convert_alpha()
-        scaled_image = pygame.transform.smoothscale(image, (width, height))
-        return scaled_image
+    def create_display(self):
+        self.display = self.game.asset_loader.display_for(self, self.current_image_path, self.screen_rect.width, self.screen_rect.height)
+        if self.display is None:
+            self.display = self.game.assets.get_scaled(self.current_image_path, self.screen_rect.width, self.screen_rect.height)
 
     def clicked(self):
         self.roll()
@@ -42,8 +44,7 @@ class Dice(BoardObject):
     def roll(self, result=None, send_message=True):
         if result is None:
             result = random.randint(0, len(self.paths) - 1)
-        ongoing_event = OngoingRoll(self, result, self.game)
-        self.game.add_ongoing(ongoing_event)
+        Animations.roll(self.game, self, result)
         if send_message:
             self.game.network_mg.dice_rolled_send(self, result)
 
@@ -0,0 +1,19 @@
+class EntityRegistry(dict):
+    """Objects by network id.
+
+    Tracks one past the highest id ever stored, so new ids are handed out
+    in constant time instead of scanning the keys."""
+
+    def __init__(self):
+        super().__init__()
+        self.next_id = 0
+
+    def __setitem__(self, _id, obj):
+        super().__setitem__(_id, obj)
+        if _id >= self.next_id:
+            self.next_id = _id + 1
+
+    def allocate(self, obj):
+        obj._id = self.next_id
+        self[obj._id] = obj
+        return obj._id
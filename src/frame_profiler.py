@@ -0,0 +1,127 @@
+import time
+
+import numpy as np
+import pygame
+
+from src.text_cache import TextCache
+
+class FrameProfiler:
+    """Per-phase frame timings kept in ring buffers.
+
+    Call `begin_frame`, then `mark` after each phase of the frame and
+    `end_frame` at the end; every mark stores the time since the previous
+    one, in milliseconds, in that phase's row. Recording is a clock read and
+    one array write per phase, statistics are only computed when asked for."""
+
+    CAPACITY = 240
+
+    def __init__(self, phases, capacity=CAPACITY, clock=time.perf_counter):
+        self.phases = list(phases) + ["frame"]
+        self.rows = {phase: row for row, phase in enumerate(self.phases)}
+        self.samples = np.zeros((len(self.phases), capacity), np.float64)
+        self.capacity = capacity
+        self.clock = clock
+        self.index = 0
+        self.count = 0
+        self.frame_start = None
+        self.last = None
+
+    def begin_frame(self):
+        self.frame_start = self.last = self.clock()
+
+    def mark(self, phase):
+        now = self.clock()
+        self.samples[self.rows[phase], self.index] = (now - self.last) * 1000
+        self.last = now
+
+    def end_frame(self):
+        self.samples[-1, self.index] = (self.last - self.frame_start) * 1000
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def stats(self):
+        """Phase -> (p50, p95, max) in milliseconds over the recorded frames."""
+        if self.count == 0:
+            return {phase: (0.0, 0.0, 0.0) for phase in self.phases}
+        samples = self.samples[:, :self.count]
+        p50, p95 = np.percentile(samples, (50, 95), axis=1)
+        peak = samples.max(axis=1)
+        return {phase: (p50[row], p95[row], peak[row]) for phase, row in self.rows.items()}
+
+class ProfilerOverlay:
+    """Frame timings and board counters drawn over the top left of the
+    window. The text is only rebuilt every REFRESH_MS, and nothing is done
+    at all while the overlay is hidden."""
+
+    REFRESH_MS = 250
+    FONT_SIZE = 20
+    LINE_HEIGHT = 17
+    WIDTH = 330
+    MARGIN = 6
+    # Right edges of the p50, p95 and max columns
+    COLUMNS = (150, 210, 270)
+    TEXT_COLOR = (235, 235, 235)
+    BACKGROUND_COLOR = (20, 20, 20)
+
+    def __init__(self, game, profiler):
+        self.game = game
+        self.profiler = profiler
+        self.visible = False
+        self.surface = None
+        self.last_refresh = None
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.surface = None
+        if not self.visible:
+            # Uncover whatever the panel was drawn over
+            self.game.renderer.full_repaint = True
+
+    def lines(self):
+        """Rows of the panel, timing rows are split into columns."""
+        game = self.game
+        lines = [("ms", "p50", "p95", "max")]
+        for phase, (p50, p95, peak) in self.profiler.stats().items():
+            lines.append((phase, f"{p50:.2f}", f"{p95:.2f}", f"{peak:.2f}"))
+        renderer = game.renderer
+        lines.append(f"sprites {len(game.sprite_group)}  rendered {len(game.sprite_group.render_list)}")
+        lines.append(f"drawn {renderer.drawn_count}  culled {renderer.culled_count}  static {renderer.static_count}")
+        disk_cache = game.assets.disk_cache
+        disk = f"  disk {disk_cache.hits}/{disk_cache.hits + disk_cache.misses}" if disk_cache is not None else ""
+        lines.append(f"assets hit {game.assets.hit_rate():.0%}{disk}  loading {len(game.asset_loader.queued)}")
+        tcp, udp, batched = game.network_mg.queue_depths()
+        lines.append(f"network tcp {tcp}  udp {udp}  batched {batched}")
+        return lines
+
+    def build(self):
+        lines = self.lines()
+        font = TextCache.font(ProfilerOverlay.FONT_SIZE)
+        height = len(lines) * ProfilerOverlay.LINE_HEIGHT + 2 * ProfilerOverlay.MARGIN
+        surface = pygame.Surface((ProfilerOverlay.WIDTH, height))
+        surface.fill(ProfilerOverlay.BACKGROUND_COLOR)
+        for i, line in enumerate(lines):
+            y = ProfilerOverlay.MARGIN + i * ProfilerOverlay.LINE_HEIGHT
+            if isinstance(line, str):
+                line = (line,)
+            surface.blit(font.render(line[0], True, ProfilerOverlay.TEXT_COLOR), (ProfilerOverlay.MARGIN, y))
+            for cell, right in zip(line[1:], ProfilerOverlay.COLUMNS):
+                text = font.render(cell, True, ProfilerOverlay.TEXT_COLOR)
+                surface.blit(text, text.get_rect(topright=(right, y)))
+        return surface
+
+    def draw(self, display_surface, dirty_rects):
+        """Draw the panel on top of the rendered frame and add it to the
+        frame's dirty rects."""
+        if not self.visible:
+            return dirty_rects
+        now = pygame.time.get_ticks()
+        if self.surface is None or now - self.last_refresh >= ProfilerOverlay.REFRESH_MS:
+            previous = self.surface
+            self.surface = self.build()
+            self.last_refresh = now
+            if previous is not None and previous.get_size() != self.surface.get_size():
+                self.game.renderer.full_repaint = True
+        rect = display_surface.blit(self.surface, (0, 0))
+        if dirty_rects is not None:
+            dirty_rects.append(rect)
+        return dirty_rects
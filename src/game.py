@@ -3,15 +3,26 @@ import json
 import os
 import pygame, sys
 import random
+import numpy as np
+
+from collections import OrderedDict
+from contextlib import contextmanager
 
 from random import randint
 
 from src.board_state import BoardState, BoardStateType
-from src.state_manager import GameStateManager
+from src.state_manager import GameStateManager, SaveWorker
+from src.asset_manager import AssetManager
+from src.surface_cache import SurfaceCache
+from src.asset_loader import AssetLoader
 from src.network_manager import NetworkManager
 from src.button_sprite import ShuffleButton, SitButton, RetrieveButton
 from src.board_object import BoardObject
-from src.ongoing import OngoingMove, OngoingShuffle, OngoingRoll
+from src.render_list import RenderList
+from src.spatial_index import SpatialGrid
+from src.entity_registry import EntityRegistry
+from src.animation import Animator
+from src.frame_profiler import FrameProfiler, ProfilerOverlay
 from src.image_sprite import Image
 from src.dice_sprite import Dice
 from src.cursor_sprite import Cursor
@@ -31,6 +42,7 @@ class Camera:
         self.offset_x = 0
         self.offset_y = 0
         self.global_rotation = 0
+        self.rotation_terms_for = None
         self.center()
 
     def zoom(self, new_zoom_scale):
@@ -66,61 +78,277 @@ class Camera:
         reversed_y = (y / self.zoom_scale) - self.offset_y
         return reversed_x, reversed_y
 
+    def rotation_terms(self):
+        """cos and sin of the board rotation and of its inverse, recomputed
+        only when global_rotation changes."""
+        if self.rotation_terms_for != self.global_rotation:
+            self.rotation_terms_for = self.global_rotation
+            forward = math.radians(-self.global_rotation)
+            backward = math.radians(self.global_rotation)
+            self.forward_terms = (math.cos(forward), math.sin(forward))
+            self.backward_terms = (math.cos(backward), math.sin(backward))
+        return self.forward_terms, self.backward_terms
+
     def apply_rotation(self, x, y):
-        radians = math.radians(-self.global_rotation)
-        rotated_x = x * math.cos(radians) - y * math.sin(radians)
-        rotated_y = x * math.sin(radians) + y * math.cos(radians)
+        (cos, sin), _ = self.rotation_terms()
+        rotated_x = x * cos - y * sin
+        rotated_y = x * sin + y * cos
         return rotated_x, rotated_y
 
     def reverse_rotation(self, x, y):
-        radians = math.radians(self.global_rotation)
-        reversed_x = x * math.cos(radians) - y * math.sin(radians)
-        reversed_y = x * math.sin(radians) + y * math.cos(radians)
+        _, (cos, sin) = self.rotation_terms()
+        reversed_x = x * cos - y * sin
+        reversed_y = x * sin + y * cos
         return reversed_x, reversed_y
 
+    def world_to_screen_many(self, xs, ys):
+        """Transform arrays of world points in one go.
+
+        Applies the same operations in the same order as apply_rotation and
+        apply_zoom, so results match the scalar path exactly."""
+        (cos, sin), _ = self.rotation_terms()
+        rotated_x = xs * cos - ys * sin
+        rotated_y = xs * sin + ys * cos
+        return (rotated_x + self.offset_x) * self.zoom_scale, (rotated_y + self.offset_y) * self.zoom_scale
+
     def center(self):
         display_surface = pygame.display.get_surface()
         self.offset_x = display_surface.get_rect().width / 2
         self.offset_y = display_surface.get_rect().height / 2
 
+    def screen_to_world(self, x, y):
+        return self.reverse_rotation(*self.reverse_zoom(x, y))
+
     def mouse_pos(self):
-        return self.reverse_rotation(*self.reverse_zoom(*pygame.mouse.get_pos()))
+        return self.screen_to_world(*pygame.mouse.get_pos())
+
+    def view_rect(self, margin=0):
+        """World-space bounding box of the window, grown by `margin` screen pixels."""
+        width, height = pygame.display.get_surface().get_size()
+        corners = [self.screen_to_world(x, y)
+                   for x, y in ((-margin, -margin), (width + margin, -margin), (-margin, height + margin), (width + margin, height + margin))]
+        min_x = math.floor(min(x for x, _ in corners))
+        min_y = math.floor(min(y for _, y in corners))
+        max_x = math.ceil(max(x for x, _ in corners))
+        max_y = math.ceil(max(y for _, y in corners))
+        return pygame.Rect(min_x, min_y, max_x - min_x, max_y - min_y)
 
 class Renderer:
     BACKGROUND_COLOR = "#E1E1E1"
-
-    def __init__(self, group):
+    # Byte bound for rotated displays that are not loaded textures
+    ROTATION_CACHE_BYTES = 32 * 1024 * 1024
+    # Screen pixels around the window still treated as visible, covers
+    # sprites drawn at a fixed screen size such as cursors
+    CULL_MARGIN = 64
+    # Frames a sprite stays out of the static layer after it last moved
+    DYNAMIC_FRAMES = 30
+
+    def __init__(self, group, assets):
         self.display_surface = pygame.display.get_surface()
         self.group = group
+        self.assets = assets
+        # (display, rotation) -> rotated display, least recently used first
+        self.rotation_cache = OrderedDict()
+        self.rotation_cache_bytes = 0
+        self.drawn_count = 0
+        self.culled_count = 0
+        # sprite -> (surface, screen rect) as blitted in the last frame
+        self.drawn = dict()
+        self.camera_state = None
+        self.full_repaint = True
+        self.frame = 0
+        self.static_layer = None
+        # sprite -> (surface, screen rect) as composited into the static layer
+        self.static_members = None
+        self.static_count = 0
+        self.dynamic_until = dict()
+
+    def rotated(self, sprite, rotation):
+        """Return the sprite's display rotated by a multiple of ROTATION_STEP, cached.
+
+        Loaded textures are cached by the asset manager under their path,
+        size and rotation, within its byte budget. Other displays (stand-ins,
+        holders, buttons...) are cached here by surface, the source is kept
+        in the entry and counted against ROTATION_CACHE_BYTES."""
+        display = sprite.display
+        rotation %= ROTATION_STEP_MOD
+        if rotation == 0:
+            return display
+        if sprite.texture_key is not None:
+            return self.assets.get_rotated(*sprite.texture_key, rotation, display)
+        key = (display, rotation)
+        rotated = self.rotation_cache.get(key)
+        if rotated is not None:
+            self.rotation_cache.move_to_end(key)
+            return rotated
+        rotated = self.rotation_cache[key] = pygame.transform.rotate(display, rotation)
+        self.rotation_cache_bytes += Renderer.surface_bytes(display) + Renderer.surface_bytes(rotated)
+        while self.rotation_cache_bytes > self.ROTATION_CACHE_BYTES and len(self.rotation_cache) > 1:
+            (source, _), evicted = self.rotation_cache.popitem(last=False)
+            self.rotation_cache_bytes -= Renderer.surface_bytes(source) + Renderer.surface_bytes(evicted)
+        return rotated
+
+    @staticmethod
+    def surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def invalidate_rotations(self):
+        self.rotation_cache.clear()
+        self.rotation_cache_bytes = 0
 
     def render(self):
-        self.display_surface.fill(Renderer.BACKGROUND_COLOR)
-
-        for sprite in sorted([s for s in self.group.sprites() if s.render], key= lambda x : x.z_index):
+        """Draw the frame and return the screen rects that changed, or None
+        when the whole window was repainted.
+
+        Sprites are split into a static layer and a dynamic one. Sprites that
+        moved during the last DYNAMIC_FRAMES frames (held, animating or
+        remotely moved objects), overlay sprites such as cursors, and anything
+        stacked on top of those are dynamic. The rest is composited into a
+        cached surface, which is only patched when one of its members changes
+        and is blitted in one call. Camera changes draw straight to the screen and
+        leave the static layer to be rebuilt once the camera settles."""
+        self.frame += 1
+        self.display_surface = pygame.display.get_surface()
+        view = self.camera.view_rect(self.CULL_MARGIN)
+        visible = self.group.rendered_in_rect(view)
+        self.drawn_count = len(visible)
+        self.culled_count = len(self.group.render_list) - self.drawn_count
+        placements = self.place_all(visible)
+        order_changes = self.group.take_order_changes()
+        for sprite in self.group.take_geometry_changes():
+            self.dynamic_until[sprite] = self.frame + self.DYNAMIC_FRAMES
+        self.dynamic_until = {sprite: until for sprite, until in self.dynamic_until.items() if until > self.frame}
+
+        static_placements = []
+        dynamic_placements = []
+        dynamic_rects = []
+        for placement in placements:
+            sprite, _, rect = placement
+            # A sprite stacked above a dynamic one it overlaps has to be drawn
+            # after it, so it cannot live in the static layer either
+            if sprite.layer != BoardObject.LAYER_BOARD or sprite in self.dynamic_until or rect.collidelist(dynamic_rects) != -1:
+                dynamic_placements.append(placement)
+                dynamic_rects.append(rect)
+            else:
+                static_placements.append(placement)
+        self.static_count = len(static_placements)
+
+        camera_state = (self.camera.zoom_scale, self.camera.offset_x, self.camera.offset_y,
+                        self.camera.global_rotation, self.display_surface.get_size())
+        if self.full_repaint or camera_state != self.camera_state:
+            self.full_repaint = False
+            self.camera_state = camera_state
+            self.static_members = None
+            self.display_surface.fill(Renderer.BACKGROUND_COLOR)
+            for sprite, surface, rect in placements:
+                self.display_surface.blit(surface, rect)
+            self.drawn = {sprite: (surface, rect) for sprite, surface, rect in placements}
+            return None
+
+        static_dirty_rects = self.update_static_layer(static_placements, order_changes)
+        dirty_rects, self.drawn = self.changed_rects(self.drawn, placements, order_changes)
+        screen_rect = self.display_surface.get_rect()
+        dirty_rects = Renderer.clip_rects(dirty_rects + (static_dirty_rects or []), screen_rect)
+        if static_dirty_rects is None or Renderer.area(dirty_rects) > screen_rect.width * screen_rect.height // 2:
+            self.display_surface.blit(self.static_layer, (0, 0))
+            for sprite, surface, rect in dynamic_placements:
+                self.display_surface.blit(surface, rect)
+            return None
+
+        for dirty_rect in dirty_rects:
+            self.display_surface.set_clip(dirty_rect)
+            self.display_surface.blit(self.static_layer, dirty_rect, dirty_rect)
+            for sprite, surface, rect in dynamic_placements:
+                if rect.colliderect(dirty_rect):
+                    self.display_surface.blit(surface, rect)
+        self.display_surface.set_clip(None)
+        return dirty_rects
+
+    def update_static_layer(self, placements, order_changes):
+        """Bring the static layer up to date, returning the rects that were
+        patched or None when it had to be rebuilt."""
+        size = self.display_surface.get_size()
+        if self.static_members is not None and self.static_layer.get_size() == size:
+            dirty_rects, self.static_members = self.changed_rects(self.static_members, placements, order_changes)
+            dirty_rects = Renderer.clip_rects(dirty_rects, self.static_layer.get_rect())
+            if Renderer.area(dirty_rects) <= size[0] * size[1] // 2:
+                for dirty_rect in dirty_rects:
+                    self.static_layer.set_clip(dirty_rect)
+                    self.static_layer.fill(Renderer.BACKGROUND_COLOR, dirty_rect)
+                    for sprite, surface, rect in placements:
+                        if rect.colliderect(dirty_rect):
+                            self.static_layer.blit(surface, rect)
+                self.static_layer.set_clip(None)
+                return dirty_rects
+
+        if self.static_layer is None or self.static_layer.get_size() != size:
+            self.static_layer = pygame.Surface(size).convert()
+        self.static_layer.fill(Renderer.BACKGROUND_COLOR)
+        for sprite, surface, rect in placements:
+            self.static_layer.blit(surface, rect)
+        self.static_members = {sprite: (surface, rect) for sprite, surface, rect in placements}
+        return None
+
+    @staticmethod
+    def changed_rects(previous, placements, order_changes):
+        """Compare placements with what was drawn before.
+
+        A sprite is dirty when its screen rect or surface differs, when its
+        z index or render flag changed, or when it appeared or vanished."""
+        dirty_rects = []
+        drawn = dict()
+        for sprite, surface, rect in placements:
+            drawn[sprite] = (surface, rect)
+            before = previous.get(sprite)
+            if before is None:
+                dirty_rects.append(rect)
+            elif before[1] != rect:
+                dirty_rects.append(before[1])
+                dirty_rects.append(rect)
+            elif before[0] is not surface or sprite in order_changes:
+                dirty_rects.append(rect)
+        for sprite, (_, rect) in previous.items():
+            if sprite not in drawn:
+                dirty_rects.append(rect)
+        return dirty_rects, drawn
+
+    @staticmethod
+    def clip_rects(rects, bounds):
+        return [rect.clip(bounds) for rect in rects if rect.colliderect(bounds)]
+
+    @staticmethod
+    def area(rects):
+        return sum(rect.width * rect.height for rect in rects)
+
+    def place_all(self, sprites):
+        """Return (sprite, surface to blit, screen rect) for each sprite.
+
+        The camera transform is applied to every position in one vectorized
+        call rather than per sprite."""
+        if len(sprites) == 0:
+            return []
+        # Sprite might be inner rotated
+        topleft = np.array([sprite.screen_rect.topleft for sprite in sprites], dtype=np.float64)
+        pos_xs, pos_ys = self.camera.world_to_screen_many(topleft[:, 0], topleft[:, 1])
+        global_rotation = self.camera.global_rotation
+        if global_rotation in (90, 180, 270):
+            size = np.array([sprite.screen_rect.size for sprite in sprites], dtype=np.float64)
+            if global_rotation == 90:
+                pos_ys -= size[:, 0]
+            elif global_rotation == 180:
+                pos_xs -= size[:, 0]
+                pos_ys -= size[:, 1]
+            else:
+                pos_xs -= size[:, 1]
+        placements = []
+        for sprite, pos_x, pos_y in zip(sprites, pos_xs.tolist(), pos_ys.tolist()):
             if sprite.static_rendering:
-                self.display_surface.blit(sprite.display, sprite.screen_rect.topleft)
+                placements.append((sprite, sprite.display, pygame.Rect(sprite.screen_rect.topleft, sprite.display.get_size())))
                 continue
-            # Sprite might be inner rotated
-            pos_x, pos_y = self.camera.apply_zoom(*self.camera.apply_rotation(*sprite.screen_rect.topleft))
-            global_rotation = self.camera.global_rotation
             rotation = 0 if sprite._type == "cursor" else global_rotation + sprite.rotation
-            rotated_sprite = pygame.transform.rotate(sprite.display, rotation)
-            if global_rotation == 90:
-                pos_y -= sprite.screen_rect.width
-            elif global_rotation == 180:
-                pos_x -= sprite.screen_rect.width
-                pos_y -= sprite.screen_rect.height
-            elif global_rotation == 270:
-                pos_x -= sprite.screen_rect.height
-            self.display_surface.blit(rotated_sprite, (pos_x, pos_y))
-
-        # Debugging
-        #center = self.camera.apply_zoom(0, 0)
-        #pygame.draw.circle(self.display_surface, 'red', center, 10)
-        #mouse_pos = self.camera.reverse_zoom(*pygame.mouse.get_pos())
-        #font = pygame.font.SysFont(None, 24)
-        #text_surface = font.render(f'{mouse_pos}', True, 'black')
-        #self.display_surface.blit(text_surface, (10, 10))
+            rotated_sprite = self.rotated(sprite, rotation)
+            placements.append((sprite, rotated_sprite, pygame.Rect((pos_x, pos_y), rotated_sprite.get_size())))
+        return placements
 
 class TransformManager:
 
@@ -130,12 +358,14 @@ class TransformManager:
     def move_sprite_abs(self, sprite, abs):
         sprite.world_rect.move_ip(abs)
         sprite.screen_rect.move_ip(abs)
+        sprite.geometry_changed()
 
     def move_sprite_to(self, sprite, x, y):
         x = round(x / PIXEL_PERFECT) * PIXEL_PERFECT
         y = round(y / PIXEL_PERFECT) * PIXEL_PERFECT
         sprite.world_rect.topleft = (x, y)
         sprite.screen_rect.topleft = (x, y)
+        sprite.geometry_changed()
 
     def move_sprite_to_centered(self, sprite, x, y):
         sprite.world_rect.center = (x, y)
@@ -145,14 +375,16 @@ class TransformManager:
         y = round(sprite.screen_rect.topleft[1] / PIXEL_PERFECT) * PIXEL_PERFECT
         sprite.world_rect.topleft = (x, y)
         sprite.screen_rect.topleft = (x, y)
+        sprite.geometry_changed()
 
     def move_sprite_to_centered_zoomed(self, sprite, x, y):
-        x, y = self.camera.reverse_rotation(*self.camera.reverse_zoom(x, y))
+        x, y = self.camera.screen_to_world(x, y)
         # Experimental feature
         x = round(x / PIXEL_PERFECT) * PIXEL_PERFECT
         y = round(y / PIXEL_PERFECT) * PIXEL_PERFECT
         sprite.world_rect.topleft = (x - sprite.world_rect.width / 2, y - sprite.world_rect.height / 2)
         sprite.screen_rect.topleft = (x - sprite.screen_rect.width / (2 * self.camera.zoom_scale), y - sprite.screen_rect.height / (2 * self.camera.zoom_scale))
+        sprite.geometry_changed()
 
 class CollisionManager:
 
@@ -163,21 +395,168 @@ class CollisionManager:
         return rect1.colliderect(rect2)
 
     def collidepoint(self, rect, point_pos):
-        return rect.collidepoint(self.camera.reverse_rotation(*self.camera.reverse_zoom(*point_pos)))
+        return rect.collidepoint(self.camera.screen_to_world(*point_pos))
 
 
 class SpriteGroup(pygame.sprite.Group):
+    # Past this many deferred order changes the render list is re-sorted
+    # whole instead of patched sprite by sprite
+    REBUILD_AFTER = 256
+
     def __init__(self):
         super().__init__()
+        self.render_list = RenderList()
+        self.spatial_index = SpatialGrid()
+        # Sprites join the group before their world_rect exists, so they are
+        # indexed on the first query instead
+        self.unindexed = set()
+        self.order_changes = set()
+        self.geometry_changes = set()
+        self.add_counter = 0
+        self.frame_updated = dict()
+        # _type is only set once a sprite's constructor finishes, so sprites
+        # are filed by type on the first query after they join
+        self.by_type = dict()
+        self.sprite_types = dict()
+        self.untyped = dict()
+        self.deferring = 0
+        self.deferred_order = dict()
+        self.deferred_updates = dict()
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.add_counter += 1
+        sprite._add_order = self.add_counter
+        self.render_list.refresh(sprite)
+        self.unindexed.add(sprite)
+        self.untyped[sprite] = None
+        if sprite.UPDATE_EVERY_FRAME:
+            self.frame_updated[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.frame_updated.pop(sprite, None)
+        self.untyped.pop(sprite, None)
+        _type = self.sprite_types.pop(sprite, None)
+        if _type is not None:
+            del self.by_type[_type][sprite]
+        self.render_list.discard(sprite)
+        self.spatial_index.remove(sprite)
+        self.unindexed.discard(sprite)
+        self.deferred_order.pop(sprite, None)
+        self.deferred_updates.pop(sprite, None)
+
+    def update(self, *args, **kwargs):
+        for sprite in list(self.frame_updated):
+            sprite.update(*args, **kwargs)
+
+    @contextmanager
+    def deferred(self):
+        """Hold back draw order refreshes and sprite updates until the
+        outermost block exits, then apply each once."""
+        self.deferring += 1
+        try:
+            yield
+        finally:
+            self.deferring -= 1
+            if self.deferring == 0:
+                self.apply_deferred()
+
+    def defer_update(self, sprite):
+        if self.deferring == 0:
+            return False
+        self.deferred_updates[sprite] = None
+        return True
+
+    def apply_deferred(self):
+        order, self.deferred_order = self.deferred_order, dict()
+        if len(order) > SpriteGroup.REBUILD_AFTER:
+            self.render_list.rebuild(self.sprites())
+        else:
+            for sprite in order:
+                self.render_list.refresh(sprite)
+        updates, self.deferred_updates = self.deferred_updates, dict()
+        for sprite in updates:
+            sprite.update()
+
+    def sprite_order_changed(self, sprite):
+        if self.deferring > 0:
+            self.deferred_order[sprite] = None
+        else:
+            self.render_list.refresh(sprite)
+        self.order_changes.add(sprite)
+
+    def take_order_changes(self):
+        order_changes = self.order_changes
+        self.order_changes = set()
+        return order_changes
+
+    def sprite_geometry_changed(self, sprite):
+        if sprite not in self.unindexed:
+            self.spatial_index.update(sprite)
+        self.geometry_changes.add(sprite)
+
+    def take_geometry_changes(self):
+        geometry_changes = self.geometry_changes
+        self.geometry_changes = set()
+        return geometry_changes
+
+    def flush_spatial_index(self):
+        for sprite in self.unindexed:
+            self.spatial_index.update(sprite)
+        self.unindexed.clear()
+
+    def flush_types(self):
+        for sprite in self.untyped:
+            self.sprite_types[sprite] = sprite._type
+            self.by_type.setdefault(sprite._type, dict())[sprite] = None
+        self.untyped.clear()
+
+    def of_type(self, _type):
+        self.flush_types()
+        return list(self.by_type.get(_type, ()))
+
+    def rendered(self):
+        return list(self.render_list)
+
+    def rendered_in_rect(self, rect):
+        """Rendered sprites overlapping a world rect, bottom to top."""
+        self.flush_spatial_index()
+        candidates = self.spatial_index.query(rect.x, rect.y, rect.width, rect.height)
+        return sorted((s for s in candidates if s.render and rect.colliderect(s.world_rect)), key=lambda x : x.order_key())
+
+    def rendered_at(self, x, y):
+        """Rendered sprites containing a world point, top to bottom."""
+        # Rect.collidepoint truncates float coordinates, query the same cell
+        x, y = int(x), int(y)
+        self.flush_spatial_index()
+        candidates = self.spatial_index.query(x, y, 1, 1)
+        return sorted((s for s in candidates if s.render and s.world_rect.collidepoint(x, y)), key=lambda x : x.order_key(), reverse=True)
+
+    def of_type_in_rect(self, rect, _type):
+        """Sprites of a type overlapping a world rect, rendered or not, top to bottom."""
+        self.flush_spatial_index()
+        candidates = self.spatial_index.query(rect.x, rect.y, rect.width, rect.height)
+        return sorted((s for s in candidates if s._type == _type and rect.colliderect(s.world_rect)), key=lambda x : x.order_key(), reverse=True)
 
 class Game(BoardState):
     FPS = 60
     WINDOW_WIDTH = 1280
     WINDOW_HEIGHT = 720
+    # Milliseconds between autosaves, 0 disables autosaving
+    AUTOSAVE_INTERVAL = 0
+    # Keys nudging the last held object, in priority order; a held key
+    # repeats after the delay, one pixel per interval (milliseconds)
+    NUDGE_KEYS = {pygame.K_j: (-1, 0), pygame.K_l: (1, 0), pygame.K_i: (0, -1), pygame.K_k: (0, 1)}
+    NUDGE_REPEAT_DELAY = 250
+    NUDGE_REPEAT_INTERVAL = 16
+    # Timed phases of a frame, in the order entry() runs them
+    FRAME_PHASES = ("events", "assets", "animation", "update", "render", "network", "autosave", "display")
+    AUTOSAVE_PATH = "autosave.zip"
 
     def __init__(self, state_manager, data):
         super().__init__(state_manager)
-        self.network_mg = NetworkManager(self, data["tcp_client"], data["udp_client"])
+        self.network_mg = NetworkManager(self, data["tcp_client"], data["udp_client"], data.get("shuffle_seed"))
         self.color = data["color"]
         self.name = data["name"]
 
@@ -186,13 +565,20 @@ class Game(BoardState):
         self.running = True
         self.state = "playing"
 
+        self.assets = AssetManager(disk_cache=SurfaceCache())
+        self.save_worker = SaveWorker(self.assets)
+        self.last_autosave = pygame.time.get_ticks()
         self.sprite_group = SpriteGroup()
-        self.renderer = Renderer(self.sprite_group)
+        self.renderer = Renderer(self.sprite_group, self.assets)
         self.camera = Camera(self.sprite_group)
         self.collision_manager = CollisionManager(self.camera)
         self.transform_manager = TransformManager(self.camera)
+        self.animator = Animator(self.transform_manager)
         self.renderer.camera = self.camera
+        self.asset_loader = AssetLoader(self.assets, self.camera)
         self.sprite_group.camera = self.camera
+        self.profiler = FrameProfiler(Game.FRAME_PHASES)
+        self.profiler_overlay = ProfilerOverlay(self, self.profiler)
 
         self.font = pygame.font.SysFont(None, 36)
         self.moving_around_board = False
@@ -201,53 +587,83 @@ class Game(BoardState):
         self.moved_holding_object = False
         self.held_object = None
         self.last_held_object = None
-        self.held_down_counter = 0
+        self.next_nudge = None
         self.z_index_iota = 0
         self.zoom_index = 3
         self.zooms = [0.5, 0.6, 0.8, 1.0, 1.2, 1.4, 1.6]
-        self.ongoing = []
         self.selection_present = False
 
         self.other_cursors = dict()
+        # Sprites told they are hovered, so only they need to be told when
+        # the mouse leaves
+        self.hovered = []
+        self.drop_targets = []
 
-        self.mp = {}
+        self.mp = EntityRegistry()
         self.GIP = GameInfoProvider(self, self.sprite_group)
         self.GOM = GameObjectManipulator(self, self.sprite_group, self.GIP)
 
-
-        def assign_id(obj):
-            if len(self.mp) == 0:
-                iota = 0
-            else:
-                iota = max(self.mp.keys()) + 1
-            obj._id = iota
-            self.mp[obj._id] = obj
         GameStateManager.load_game_state(self, "dice_throne.zip")
         self.network_mg.set_networking(True)
 
         self.selection = Selection(self.color, self.sprite_group, self)
-        assign_id(self.selection)
-        self.assign_inf_z_index(self.selection)
+        self.mp.allocate(self.selection)
 
     def entry(self):
         """Main game loop."""
         #self.network_mg.get_game_state()
+        profiler = self.profiler
         while self.running:
+            profiler.begin_frame()
             self.handle_events()
-            self.handle_ongoing()
+            profiler.mark("events")
+            self.asset_loader.process()
+            profiler.mark("assets")
+            self.animator.update()
+            profiler.mark("animation")
             self.sprite_group.update()
-            self.renderer.render()
+            profiler.mark("update")
+            dirty_rects = self.renderer.render()
+            dirty_rects = self.profiler_overlay.draw(self.renderer.display_surface, dirty_rects)
+            profiler.mark("render")
             self.network_mg.process_networking()
-            pygame.display.update()
+            profiler.mark("network")
+            self.autosave()
+            profiler.mark("autosave")
+            pygame.display.update(dirty_rects)
+            profiler.mark("display")
+            profiler.end_frame()
             self.clock.tick(self.FPS)
 
     def handle_events(self):
+        # Consecutive motion events are handled as one, so hovering, dragging
+        # and the network sends they cause run once per frame rather than
+        # once per mouse poll. Other events flush the pending motion first,
+        # buttons still see the pointer where it was when they were pressed.
+        motion = None
         for event in pygame.event.get():
+            if event.type == pygame.MOUSEMOTION:
+                motion = Game.merge_motion(motion, event)
+                continue
+            if motion is not None:
+                self.handle_input(motion)
+                motion = None
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.VIDEORESIZE:
                 self.WINDOW_WIDTH, self.WINDOW_HEIGHT = event.w, event.h
             self.handle_input(event)
+        if motion is not None:
+            self.handle_input(motion)
+        self.repeat_nudge()
+
+    @staticmethod
+    def merge_motion(motion, event):
+        if motion is None:
+            return event
+        rel_x, rel_y = getattr(motion, "rel", (0, 0))
+        dx, dy = getattr(event, "rel", (0, 0))
+        return pygame.event.Event(pygame.MOUSEMOTION, {**event.dict, "rel": (rel_x + dx, rel_y + dy)})
 
     def handle_input(self, event):
         if event.type == pygame.KEYUP:
@@ -262,11 +678,8 @@ class Game(BoardState):
             self.mouse_button_down(event)
         elif event.type == pygame.MOUSEBUTTONUP:
             self.mouse_button_up(event)
-        else:
-            self.move_last_held_object()
 
     def key_up(self, event):
-        self.held_down_counter = 0
         if self.selection_present:
             self.process_end_selection()
 
@@ -279,10 +692,16 @@ class Game(BoardState):
             self.process_board_rotation(event)
         elif event.key in [pygame.K_c]:
             self.camera.center()
-        elif event.key in [pygame.K_j, pygame.K_i, pygame.K_k, pygame.K_l]:
-            self.move_last_held_object(False)
+        elif event.key == pygame.K_F3:
+            self.profiler_overlay.toggle()
+        elif event.key in Game.NUDGE_KEYS:
+            self.nudge_last_held_object(Game.NUDGE_KEYS[event.key])
+            self.next_nudge = pygame.time.get_ticks() + Game.NUDGE_REPEAT_DELAY
         elif event.key == pygame.K_s and (pygame.key.get_mods() & pygame.KMOD_CTRL):
-            GameStateManager.save_game_state(self, output_zip_path="game_state.zip")
+            if pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                GameStateManager.export_json(self, background=True)
+            else:
+                GameStateManager.save_game_state(self, output_zip_path="game_state.zip", background=True)
         elif event.key == pygame.K_LSHIFT:
             self.process_start_selection()
 
@@ -297,44 +716,48 @@ class Game(BoardState):
     def move_selection(self):
         self.selection.world_end_pos = self.camera.mouse_pos()
 
-    def move_last_held_object(self, count=True):
+    def nudge_last_held_object(self, direction, steps=1):
         if self.last_held_object is None:
             return
-        if count:
-            self.held_down_counter += 1
-            if self.held_down_counter <= 7:
-                return
+        self.transform_manager.move_sprite_abs(self.last_held_object, (direction[0] * steps, direction[1] * steps))
+
+    def repeat_nudge(self):
+        """Keep nudging while a nudge key is held, by however many intervals
+        passed since the last frame."""
+        if self.next_nudge is None:
+            return
         keys = pygame.key.get_pressed()
-        dx, dy = 0, 0
-        if keys[pygame.K_j]:
-            dx = -1
-        elif keys[pygame.K_l]:
-            dx = 1
-        elif keys[pygame.K_i]:
-            dy = -1
-        elif keys[pygame.K_k]:
-            dy = 1
-        else:
+        direction = next((direction for key, direction in Game.NUDGE_KEYS.items() if keys[key]), None)
+        if direction is None:
+            self.next_nudge = None
+            return
+        now = pygame.time.get_ticks()
+        if now < self.next_nudge:
             return
-        self.transform_manager.move_sprite_abs(self.last_held_object, (dx, dy))
+        steps = (now - self.next_nudge) // Game.NUDGE_REPEAT_INTERVAL + 1
+        self.next_nudge += steps * Game.NUDGE_REPEAT_INTERVAL
+        self.nudge_last_held_object(direction, steps)
 
     def process_board_rotation(self, event):
         direction = 1 if event.key == pygame.K_z else -1
         self.camera.global_rotation = (self.camera.global_rotation + direction * ROTATION_STEP) % ROTATION_STEP_MOD
+        self.renderer.invalidate_rotations()
 
     def process_rotation_clicked(self, event):
         direction = 1 if event.key == pygame.K_q else -1
         if self.held_object is not None:
             self.GOM.try_rotate_obj(direction, self.held_object)
             return
-        mouse_pos = pygame.mouse.get_pos()
-        for obj in sorted(self.GIP.get_rendered_objects(), key= lambda x : -x.z_index):
-            if self.collision_manager.collidepoint(obj.world_rect, mouse_pos):
-                self.GOM.try_rotate_obj(direction, obj)
-                break
+        for obj in self.objects_at(pygame.mouse.get_pos()):
+            self.GOM.try_rotate_obj(direction, obj)
+            break
+
+    def objects_at(self, screen_pos):
+        """Rendered objects under a screen position, topmost first."""
+        return self.sprite_group.rendered_at(*self.camera.screen_to_world(*screen_pos))
 
     def mouse_motion(self, event):
-        x, y = self.camera.mouse_pos()
+        x, y = self.camera.screen_to_world(*event.pos)
         self.network_mg.cursor_moved_send(x, y, self.name, self.color)
         if self.moving_around_board and (pygame.mouse.get_pressed()[1] or pygame.key.get_mods() & pygame.KMOD_ALT):
             self.process_moving_around_board(event)
@@ -343,17 +766,28 @@ class Game(BoardState):
         elif self.selection_present:
             self.move_selection()
         elif not self.is_holding_object:
-            self.process_mouse_hovering(event.pos)
+            self.process_mouse_hovering((x, y))
 
     def process_moving_around_board(self, event):
         self.camera.move_camera(event.rel)
 
-    def process_mouse_hovering(self, mouse_pos):
-        for sprite in self.GIP.get_rendered_objects():
-            if self.collision_manager.collidepoint(sprite.world_rect, mouse_pos):
-                sprite.hovering()
-            else:
+    def process_mouse_hovering(self, world_pos):
+        hovered = self.sprite_group.rendered_at(*world_pos)
+        for sprite in self.hovered:
+            if sprite not in hovered:
                 sprite.not_hovering()
+        for sprite in hovered:
+            sprite.hovering()
+        self.hovered = hovered
+
+    def focus_drop_targets(self, targets):
+        """Highlight the holders and hands a dragged image is over."""
+        for target in self.drop_targets:
+            if target not in targets:
+                target.mark_focused(False)
+        for target in targets:
+            target.mark_focused(True)
+        self.drop_targets = targets
 
     def mouse_button_down(self, event):
         if event.button == 2 or pygame.key.get_mods() & pygame.KMOD_ALT:
@@ -362,18 +796,17 @@ class Game(BoardState):
         elif event.button != 1:
             return
 
-        for obj in sorted(self.GIP.get_rendered_objects(), key= lambda x : -x.z_index):
-            if self.collision_manager.collidepoint(obj.world_rect, event.pos):
-                self.is_holding_object = True
-
-                if obj in self.selection:
-                    self.held_object = self.selection
-                    return
+        for obj in self.objects_at(event.pos):
+            self.is_holding_object = True
 
-                self.held_object = obj
-                if self.GIP.can_drag(obj):
-                    self.assign_z_index(obj)
+            if obj in self.selection:
+                self.held_object = self.selection
                 return
+
+            self.held_object = obj
+            if self.GIP.can_drag(obj):
+                self.assign_z_index(obj)
+            return
         self.selection.reset()
 
     def mouse_button_up(self, event):
@@ -413,27 +846,19 @@ class Game(BoardState):
         self.held_object.release()
 
     def process_click(self, mouse_pos):
-        for obj in sorted([s for s in self.sprite_group.sprites() if s.render and s.clickable], key= lambda x : -x.z_index):
-            if self.collision_manager.collidepoint(obj.world_rect, mouse_pos):
-                if obj in self.selection:
-                    self.selection.clicked()
-                    return True
-                self.selection.reset()
-                obj.clicked()
-                if obj.draggable:
-                    self.assign_z_index(obj)
+        for obj in self.objects_at(mouse_pos):
+            if not obj.clickable:
+                continue
+            if obj in self.selection:
+                self.selection.clicked()
                 return True
+            self.selection.reset()
+            obj.clicked()
+            if obj.draggable:
+                self.assign_z_index(obj)
+            return True
         return False
 
-    def handle_ongoing(self):
-        for event in self.ongoing[:]:
-            event.update()
-            if event.is_finished():
-                self.ongoing.remove(event)
-
-    def add_ongoing(self, ongoing_event):
-        self.ongoing.append(ongoing_event)
-
     def cursor_moved(self, x, y, name, color):
         if name not in self.other_cursors:
             self.other_cursors[name] = Cursor(name, color, self.sprite_group, self)
@@ -444,21 +869,49 @@ class Game(BoardState):
             self.z_index_iota = max(self.z_index_iota, self.mp[obj].z_index + 1)
 
     def assign_z_index(self, obj):
+        # z indexes are sent to the other players, so the counter only
+        # ever grows and is never renumbered locally
         if obj is not None:
             obj.z_index = self.z_index_iota
             self.z_index_iota += 1
 
-    def assign_inf_z_index(self, obj):
-        if obj is not None:
-            obj.z_index = float('inf')
+    def set_z_index(self, obj, z_index):
+        """Apply a z index chosen elsewhere, e.g. by another player."""
+        obj.z_index = z_index
+        self.z_index_iota = max(self.z_index_iota, z_index + 1)
+
+    @contextmanager
+    def batch(self):
+        """Apply many board changes as one.
+
+        Inside the block sprite displays are not rebuilt, z index changes do
+        not reorder the render list and messages to the other players are
+        held back. When the outermost block exits every touched sprite is
+        refreshed once and the messages go out together."""
+        with self.sprite_group.deferred(), self.network_mg.batch():
+            yield
 
     def handle_zoom(self, event):
         next_zoom_index = self.zoom_index + event.y
         if 0 <= next_zoom_index < len(self.zooms):
             self.zoom_index = next_zoom_index
-            self.camera.zoom(self.zooms[self.zoom_index])
+            # Sprites show the nearest cached size until their own is scaled
+            with self.asset_loader.progressive():
+                self.camera.zoom(self.zooms[self.zoom_index])
+            neighbours = self.zooms[max(0, self.zoom_index - 1):self.zoom_index] + self.zooms[self.zoom_index + 1:self.zoom_index + 2]
+            self.asset_loader.prescale(self.sprite_group.sprites(), neighbours)
+
+    def autosave(self):
+        if self.AUTOSAVE_INTERVAL <= 0:
+            return
+        now = pygame.time.get_ticks()
+        if now - self.last_autosave < self.AUTOSAVE_INTERVAL or self.save_worker.is_busy():
+            return
+        self.last_autosave = now
+        GameStateManager.save_game_state(self, output_zip_path=self.AUTOSAVE_PATH, background=True)
 
     def quit(self):
+        self.save_worker.wait()
         pygame.quit()
 
 class GameObjectManipulator:
@@ -471,6 +924,7 @@ class GameObjectManipulator:
         if self.GIP.can_rotate(obj):
             obj.rotation = (obj.rotation + ROTATION_STEP * direction) % ROTATION_STEP_MOD
             obj.world_rect.width, obj.world_rect.height = obj.world_rect.height, obj.world_rect.width
+            obj.geometry_changed()
             if send_message:
                 self.game.network_mg.rotate_object_send(obj, direction)
 
@@ -486,7 +940,7 @@ class GameInfoProvider:
         return (pygame.key.get_mods() & pygame.KMOD_CTRL) or (obj is not None and obj.draggable)
 
     def get_sprites_of_type(self, _type):
-        return [item for item in self.sprite_group.sprites() if item._type == _type]
+        return self.sprite_group.of_type(_type)
 
     def get_hands(self):
         return self.get_sprites_of_type("player_hand")
@@ -495,4 +949,4 @@ class GameInfoProvider:
         return self.get_sprites_of_type("holder")
 
     def get_rendered_objects(self):
-        return [s for s in self.sprite_group.sprites() if s.render]
+        return self.sprite_group.rendered()
@@ -1,7 +1,7 @@
 import pygame
-import random
 
 from src.board_object import BoardObject
+from src.deck import Deck
 
 class Holder(BoardObject):
     """Represents an image deck in the game."""
@@ -13,13 +13,17 @@ class Holder(BoardObject):
         self.screen_rect = pygame.rect.Rect(x, y, width, height)
         self.z_index = 0
         self._type = "holder"
-        self.deck = []
+        self.deck = Deck()
         self.render = True
         self.last_focused = True
         self.counter = 0
-        self.create_display()
+        self.refresh_display()
 
 
+    def display_inputs(self):
+        top_display = self.deck[-1].display if len(self.deck) > 0 else None
+        return (self.screen_rect.size, self.is_focused, top_display)
+
     def create_display(self):
         border_thickness = int((self.screen_rect.height + 99) / 100)
         surface = pygame.Surface((self.screen_rect.width, self.screen_rect.height), pygame.SRCALPHA)
@@ -43,30 +47,36 @@ class Holder(BoardObject):
         self.display = surface
 
     def add_image(self, image, send_message=True):
-        if image not in self.deck:
+        self.add_images([image], send_message)
+
+    def add_images(self, images, send_message=True):
+        images = [image for image in dict.fromkeys(images) if image not in self.deck]
+        if len(images) == 0:
+            return
+        with self.batch():
             if send_message:
-                self.game.network_mg.add_image_to_holder_send(self, image)
+                self.game.network_mg.add_images_to_holder_send(self, images)
             self.mark_focused(False)
-            image.render = False
-            self.deck.append(image)
-            self.create_display()
+            for image in images:
+                image.render = False
+            self.deck.extend(images)
+            self.invalidate()
 
     def pop_image(self, image=None, send_message=True):
         if len(self.deck) == 0:
             return None
         if image is None:
-            last = self.deck[-1]
+            last = self.deck.pop()
             if send_message:
                 self.game.network_mg.remove_image_from_holder_send(self, last)
-            self.deck = self.deck[:-1]
-            self.create_display()
+            self.invalidate()
             last.render = True
             return last
         else:
             # In case of networking race condition
             if image in self.deck:
                 self.deck.remove(image)
-                self.create_display()
+                self.invalidate()
                 image.render = True
                 self.game.assign_z_index(image)
                 return image
@@ -87,19 +97,30 @@ class Holder(BoardObject):
         if len(self.deck) == 0:
             return
         self.deck[-1].flip()
-        self.create_display()
+        self.invalidate()
 
-    # TODO: I don't like how is this done
-    def shuffle(self, shuffled=[]):
-        if len(shuffled) == 0:
-            self.deck = random.sample(self.deck, len(self.deck))
-        else:
-            self.deck = shuffled
-        for image in self.deck:
-            if image.is_front:
-                image.flip()
-        self.create_display()
+    def flip_all(self, is_front):
+        """Turn every card the same way without a message per card; callers
+        describe the whole change in one message."""
+        with self.batch():
+            for image in self.deck:
+                image.assign_front(is_front)
+            self.invalidate()
 
-    def update(self):
-        self.create_display()
+    def shuffle(self, seed=None, send_message=True):
+        """Shuffle into the order `seed` describes, drawing a new seed when
+        none is given. Returns the seed."""
+        if seed is None:
+            seed = self.game.network_mg.next_shuffle_seed()
+        self.deck.reorder(self.deck.seeded_order(seed))
+        self.flip_all(False)
+        if send_message:
+            self.game.network_mg.shuffle_holder_send(self, seed)
+        return seed
 
+    def set_order(self, images):
+        with self.batch():
+            for image in images:
+                image.render = False
+            self.deck.reorder(images)
+            self.flip_all(False)
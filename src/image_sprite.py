@@ -1,13 +1,12 @@
 import pygame
 
-from functools import lru_cache
 from src.board_object import BoardObject
 
 class Image(BoardObject):
+    """Represents an image in the game."""
 
-    image_cache = dict()
+    UPDATE_EVERY_FRAME = False
 
-    """Represents an image in the game."""
     def __init__(self, front_path, x, y, width, height, group, game, flipable=False, draggable=True, rotatable=True, back_path=None):
         super().__init__(group)
         self.game  = game
@@ -31,16 +30,25 @@ class Image(BoardObject):
 
         self.update()
 
-    def update(self):
-        image_path = self.front_image_path if self.is_front else self.back_image_path
-        self.display = Image.create_display(image_path, self.screen_rect.width, self.screen_rect.height, self.rotation)
+    def texture_path(self):
+        return self.front_image_path if self.is_front else self.back_image_path
+
+    def display_inputs(self):
+        return (self.texture_path(), self.screen_rect.size)
 
-    @staticmethod
-    @lru_cache(maxsize=4096)
-    def create_display(image_path, width, height, rotation):
-        image = pygame.image.load(image_path).convert_alpha()
-        scaled_image = pygame.transform.smoothscale(image, (width, height))
-        return scaled_image
+    def create_display(self):
+        image_path = self.texture_path()
+        self.display = self.game.asset_loader.display_for(self, image_path, self.screen_rect.width, self.screen_rect.height)
+        if self.display is None:
+            self.display = self.game.assets.get_scaled(image_path, self.screen_rect.width, self.screen_rect.height)
+        if self.game.asset_loader.is_waiting(self):
+            self.texture_key = None
+        else:
+            self.texture_key = (image_path, self.screen_rect.width, self.screen_rect.height)
+        # Hands draw their cards into their own display
+        for hand in self.game.GIP.get_hands():
+            if self in hand:
+                hand.invalidate()
 
     def assign_front(self, is_front):
         if self.flipable and self.is_front != is_front:
@@ -56,11 +64,8 @@ class Image(BoardObject):
                 hand.remove_image(self)
                 return
 
-        for holder in self.game.GIP.get_holders():
-            holder.mark_focused(self.game.collision_manager.colliderect(self.world_rect, holder.world_rect))
-
-        for hand in self.game.GIP.get_hands():
-            hand.mark_focused(self.game.collision_manager.colliderect(self.world_rect, hand.world_rect))
+        self.game.focus_drop_targets(self.game.sprite_group.of_type_in_rect(self.world_rect, "holder") +
+                                     self.game.sprite_group.of_type_in_rect(self.world_rect, "player_hand"))
         return self
 
     def release(self):
@@ -69,16 +74,15 @@ class Image(BoardObject):
         self._try_add_image_to_hand()
 
     def _try_add_image_to_deck(self):
-        for holder in self.game.GIP.get_holders():
-            if self.game.collision_manager.colliderect(self.world_rect, holder.world_rect):
-                holder.add_image(self)
-                return True
+        for holder in self.game.sprite_group.of_type_in_rect(self.world_rect, "holder"):
+            holder.add_image(self)
+            return True
         return False
 
     def _try_add_image_to_hand(self):
-        for hand in self.game.GIP.get_hands():
-            if self.game.collision_manager.colliderect(self.world_rect, hand.world_rect):
-                hand.add_image(self)
+        for hand in self.game.sprite_group.of_type_in_rect(self.world_rect, "player_hand"):
+            hand.add_image(self)
+            return
 
     def flip(self, send_message=True):
         if not self.flipable:
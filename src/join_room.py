@@ -40,6 +40,7 @@ class JoinRoom(BoardState):
         self.join_button_rect = pygame.Rect(0, 0, self.BUTTON_W, self.BUTTON_H)
         self.show_colors = False
         self.available_colors = []
+        self.shuffle_seed = None
         self.assigned_color = None
 
         self.tcp_client = TCPClient()
@@ -57,13 +58,15 @@ class JoinRoom(BoardState):
             "tcp_client": self.tcp_client,
             "udp_client": self.udp_client,
             "color": self.assigned_color,
-            "name": self.user_name
+            "name": self.user_name,
+            "shuffle_seed": self.shuffle_seed
         }
 
     def handle_join_received(self, message):
         if message["result"] == "success":
             self.show_colors = True
             self.available_colors = message.get("colors", [])
+            self.shuffle_seed = message.get("seed")
             self.error_message = ""
             self.udp_client.send({
                 "action": "join",
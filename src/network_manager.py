@@ -1,13 +1,14 @@
 import sys
 import random
 import base64
-import zipfile
-import io
 import socket
 import json
-from uuid import uuid4
+
+from contextlib import contextmanager
 
 from src.state_manager import GameStateManager
+from src.deck import Deck
+from src.animation import Animations
 
 MESSAGE_END = b'json_end_zk3nsh1nx'
 
@@ -23,13 +24,13 @@ class NetworkManager:
             "y": obj.world_rect.y,
             "z_index": obj.z_index
         }
-        self.udp_client.send(message)
+        self.send_udp(message)
 
     def move_object_received(self, message):
         x = message["x"]
         y = message["y"]
         obj = self.game.mp[message["object_id"]]
-        obj.z_index = message["z_index"]
+        self.game.set_z_index(obj, message["z_index"])
         self.game.transform_manager.move_sprite_to(obj, x, y)
 
     def flip_image_send(self, image):
@@ -41,25 +42,29 @@ class NetworkManager:
             "is_front": image.is_front,
             "z_index": image.z_index
         }
-        self.tcp_client.send(message)
+        self.send_tcp(message)
 
     def flip_image_received(self, message):
         image = self.game.mp[message["image_id"]]
         image.assign_front(message["is_front"])
-        image.z_index = message["z_index"]
+        self.game.set_z_index(image, message["z_index"])
         for holder in self.game.GIP.get_holders():
             if image in holder.deck:
-                holder.create_display()
+                holder.invalidate()
 
-    def add_image_to_holder_send(self, holder, image):
+    def add_images_to_holder_send(self, holder, images):
         if not self.networking_status:
             return
         message = {
-            "action": "add_image_to_holder",
-            "image_id": image._id,
+            "action": "add_images_to_holder",
+            "image_ids": [image._id for image in images],
             "holder_id": holder._id
         }
-        self.tcp_client.send(message)
+        self.send_tcp(message)
+
+    def add_images_to_holder_received(self, message):
+        holder = self.game.mp[message["holder_id"]]
+        holder.add_images([self.game.mp[image_id] for image_id in message["image_ids"]], False)
 
     def add_image_to_holder_received(self, message):
         holder = self.game.mp[message["holder_id"]]
@@ -74,7 +79,7 @@ class NetworkManager:
             "image_id": image._id,
             "holder_id": holder._id
         }
-        self.tcp_client.send(message)
+        self.send_tcp(message)
 
     def remove_image_from_holder_received(self, message):
         holder = self.game.mp[message["holder_id"]]
@@ -89,7 +94,7 @@ class NetworkManager:
             "image_id": image._id,
             "index": index
         }
-        self.tcp_client.send(message)
+        self.send_tcp(message)
 
     def add_image_to_hand_received(self, message):
         hand = self.game.mp[message["hand_id"]]
@@ -104,14 +109,50 @@ class NetworkManager:
             "hand_id": hand._id,
             "image_id": image._id
         }
-        self.tcp_client.send(message)
+        self.send_tcp(message)
 
     def remove_image_from_hand_received(self, message):
         hand = self.game.mp[message["hand_id"]]
         image = self.game.mp[message["image_id"]]
         hand.remove_image(image, send_message=False)
 
-    def shuffle_holder_send(self, holder):
+    def next_shuffle_seed(self):
+        return self.shuffle_seeds.getrandbits(63)
+
+    def shuffle_fields(self, holder, seed):
+        return {
+            "holder_id": holder._id,
+            "seed": seed,
+            "version": Deck.SHUFFLE_VERSION,
+            "checksum": holder.deck.checksum(),
+            "origin": self.game.name
+        }
+
+    def apply_shuffle(self, holder, message, shuffle):
+        """Run `shuffle` with the message's seed, or ask the sender for the
+        whole ordering when the seed cannot be reproduced here."""
+        if message.get("version") != Deck.SHUFFLE_VERSION:
+            self.holder_order_request_send(holder, message.get("origin"))
+            return
+        shuffle(message["seed"])
+        if holder.deck.checksum() != message["checksum"]:
+            self.holder_order_request_send(holder, message.get("origin"))
+
+    def shuffle_holder_send(self, holder, seed):
+        if not self.networking_status:
+            return
+        message = {"action": "shuffle_holder"}
+        message.update(self.shuffle_fields(holder, seed))
+        self.send_tcp(message)
+
+    def shuffle_holder_received(self, message):
+        holder = self.game.mp[message["holder_id"]]
+        if "deck" in message:
+            holder.set_order([self.game.mp[image_id] for image_id in message["deck"]])
+            return
+        self.apply_shuffle(holder, message, lambda seed: holder.shuffle(seed, False))
+
+    def holder_order_send(self, holder):
         if not self.networking_status:
             return
         message = {
@@ -119,11 +160,21 @@ class NetworkManager:
             "holder_id": holder._id,
             "deck": [f._id for f in holder.deck]
         }
-        self.tcp_client.send(message)
+        self.send_tcp(message)
 
-    def shuffle_holder_received(self, message):
-        holder = self.game.mp[message["holder_id"]]
-        holder.shuffle([self.game.mp[image_id] for image_id in message["deck"]])
+    def holder_order_request_send(self, holder, origin):
+        if not self.networking_status:
+            return
+        message = {
+            "action": "holder_order_request",
+            "holder_id": holder._id,
+            "origin": origin
+        }
+        self.send_tcp(message)
+
+    def holder_order_request_received(self, message):
+        if message["origin"] == self.game.name:
+            self.holder_order_send(self.game.mp[message["holder_id"]])
 
     def rotate_object_send(self, obj, direction):
         if not self.networking_status:
@@ -134,11 +185,11 @@ class NetworkManager:
             "direction": direction,
             "z_index": obj.z_index
         }
-        self.tcp_client.send(message)
+        self.send_tcp(message)
 
     def rotate_object_received(self, message):
         obj = self.game.mp[message["object_id"]]
-        obj.z_index = message["z_index"]
+        self.game.set_z_index(obj, message["z_index"])
         self.game.GOM.try_rotate_obj(message["direction"], obj, False)
 
     def retrieve_button_clicked_send(self, button):
@@ -148,22 +199,28 @@ class NetworkManager:
             "action": "retrieve_button_clicked",
             "button_id": button._id
         }
-        self.tcp_client.send(message)
+        self.send_tcp(message)
 
     def retrieve_button_clicked_received(self, message):
         self.game.mp[message["button_id"]].retrieve()
 
-    def shuffle_button_clicked_send(self, button):
+    def shuffle_button_clicked_send(self, button, seed):
         if not self.networking_status:
             return
         message = {
             "action": "shuffle_button_clicked",
             "button_id": button._id
         }
-        self.tcp_client.send(message)
+        message.update(self.shuffle_fields(button.holder, seed))
+        self.send_tcp(message)
 
     def shuffle_button_clicked_received(self, message):
-        self.game.mp[message["button_id"]].shuffle()
+        button = self.game.mp[message["button_id"]]
+        if "seed" not in message:
+            button.shuffle(send_message=False)
+            return
+        self.apply_shuffle(button.holder, message, lambda seed: button.holder.shuffle(seed, False))
+        Animations.shuffle(self.game, button.holder)
 
     def sit_button_clicked_send(self, button, player):
         if not self.networking_status:
@@ -173,7 +230,7 @@ class NetworkManager:
             "button_id": button._id,
             "player": player
         }
-        self.tcp_client.send(message)
+        self.send_tcp(message)
 
     def sit_button_clicked_received(self, message):
         self.game.mp[message["button_id"]].sit(message["player"])
@@ -187,11 +244,11 @@ class NetworkManager:
             "result": dice_result,
             "z_index": dice.z_index
         }
-        self.tcp_client.send(message)
+        self.send_tcp(message)
 
     def dice_rolled_received(self, message):
         dice = self.game.mp[message["dice_id"]]
-        dice.z_index = message["z_index"]
+        self.game.set_z_index(dice, message["z_index"])
         dice.roll(result=message["result"], send_message=False)
 
     def cursor_moved_send(self, x, y, name, color):
@@ -204,7 +261,7 @@ class NetworkManager:
             "name": name,
             "color": color
         }
-        self.udp_client.send(message)
+        self.send_udp(message)
 
     def cursor_moved_received(self, message):
         x = message["x"]
@@ -217,24 +274,72 @@ class NetworkManager:
         message = {
             "action": "get_game_state"
         }
-        self.tcp_client.send(message)
+        self.send_tcp(message)
 
     def get_game_state_received(self, message):
-        game_name = f"{str(uuid4())}.zip"
-        with open(game_name, "wb") as f:
-            f.write(base64.b64decode(message["game_state"]))
-        GameStateManager.load_game_state(self.game, game_name)
+        GameStateManager.load_game_state(self.game, base64.b64decode(message["game_state"]))
         self.set_networking(True)
 
+    @contextmanager
+    def batch(self):
+        """Collect the messages sent inside the block. TCP messages go out as
+        a single batch message, UDP ones only keep the latest per object."""
+        self.batch_depth += 1
+        try:
+            yield
+        finally:
+            self.batch_depth -= 1
+            if self.batch_depth == 0:
+                self.flush_batch()
+
+    def send_tcp(self, message):
+        if self.batch_depth > 0:
+            self.tcp_batch.append(message)
+        else:
+            self.tcp_client.send(message)
+
+    def send_udp(self, message):
+        if self.batch_depth > 0:
+            self.udp_batch[(message["action"], message.get("object_id"))] = message
+        else:
+            self.udp_client.send(message)
+
+    def flush_batch(self):
+        tcp_batch, self.tcp_batch = self.tcp_batch, []
+        udp_batch, self.udp_batch = self.udp_batch, dict()
+        if len(tcp_batch) == 1:
+            self.tcp_client.send(tcp_batch[0])
+        elif len(tcp_batch) > 1:
+            self.tcp_client.send({
+                "action": "batch",
+                "messages": tcp_batch
+            })
+        for message in udp_batch.values():
+            self.udp_client.send(message)
+
+    def queue_depths(self):
+        """Messages each client has received but not handled yet, and the
+        messages held back by an open batch."""
+        return (self.tcp_client.pending(), self.udp_client.pending(), len(self.tcp_batch) + len(self.udp_batch))
+
+    def batch_received(self, message):
+        with self.game.batch():
+            for inner in message["messages"]:
+                callback = self.callbacks.get(inner.get("action"))
+                if callback is not None:
+                    callback(inner)
+
     def init_functions(self):
         fns = {
             "flip_image": self.flip_image_received,
             "move_object": self.move_object_received,
             "add_image_to_holder": self.add_image_to_holder_received,
+            "add_images_to_holder": self.add_images_to_holder_received,
             "remove_image_from_holder": self.remove_image_from_holder_received,
             "add_image_to_hand": self.add_image_to_hand_received,
             "remove_image_from_hand": self.remove_image_from_hand_received,
             "shuffle_holder": self.shuffle_holder_received,
+            "holder_order_request": self.holder_order_request_received,
             "rotate_object": self.rotate_object_received,
             "retrieve_button_clicked": self.retrieve_button_clicked_received,
             "shuffle_button_clicked": self.shuffle_button_clicked_received,
@@ -242,7 +347,9 @@ class NetworkManager:
             "dice_rolled": self.dice_rolled_received,
             "cursor_moved": self.cursor_moved_received,
             "get_game_state": self.get_game_state_received,
+            "batch": self.batch_received,
         }
+        self.callbacks = fns
         for action_name, fn in fns.items():
             self.tcp_client.add_callback(action_name, fn)
             self.udp_client.add_callback(action_name, fn)
@@ -257,8 +364,13 @@ class NetworkManager:
             else:
                 self.udp_client.process()
 
-    def __init__(self, game, tcp_client, udp_client):
+    def __init__(self, game, tcp_client, udp_client, shuffle_seed=None):
         self.networking_status = False
+        self.batch_depth = 0
+        self.tcp_batch = []
+        self.udp_batch = dict()
+        # Seeds for shuffles come from a base the server handed out on join
+        self.shuffle_seeds = random.Random(shuffle_seed)
         self.game = game
         self.tcp_client = tcp_client
         self.udp_client = udp_client
@@ -294,6 +406,9 @@ class NetworkClient:
     def get(self):
         pass
 
+    def pending(self):
+        return 0
+
 class UDPClient(NetworkClient):
 
     def __init__(self, ip="localhost", port=23456):
@@ -372,5 +487,8 @@ class TCPClient(NetworkClient):
             print("Received malformed TCP JSON")
             return None
 
+    def pending(self):
+        return self.tcp_data.count(MESSAGE_END)
+
 
 
@@ -15,7 +15,7 @@ class PlayerHand(BoardObject):
         self.insert_image_index = 0
         self.margin = 10
         self.owner = owner
-        self.create_display()
+        self.update()
 
     def create_display(self):
         border_thickness = int((self.screen_rect.height + 99) / 100)
@@ -27,34 +27,15 @@ class PlayerHand(BoardObject):
                          (0, 0, surface.get_width(), surface.get_height()),
                          width=border_thickness)
 
-        self.insert_image_index = 0
+        self.display = surface
         deck_len = len(self.deck)
         if deck_len == 0:
-            return surface
+            return
 
         image = self.deck[0]
         image_width = image.screen_rect.width
         image_height = image.screen_rect.height
-        image_original_width = image.world_rect.width
-        image_original_height = image.world_rect.height
-        # Needed to determine where hovering image goes
         if self.is_focused:
-            closest_dist = float('inf')
-
-            start_x = (self.world_rect.width - (self.margin * deck_len + image_original_width * (deck_len + 1)) ) / 2
-            start_y = (self.world_rect.height - image_original_height) / 2
-            for i in range(deck_len + 1):
-                x = start_x + i * self.margin + i * image_original_width
-                y = start_y
-                center_x = self.world_rect.x + (x + image_original_width / 2)
-                center_y = self.world_rect.y + (y + image_original_height / 2)
-
-                mouse_x, mouse_y = self.game.camera.mouse_pos()
-                dist = math.hypot(center_x - mouse_x, center_y - mouse_y)
-                if dist < closest_dist:
-                    closest_dist = dist
-                    self.insert_image_index = i
-
             start_x = (self.screen_rect.width - (self.margin * deck_len + image.screen_rect.width * (deck_len + 1)) ) / 2
             start_y = (self.screen_rect.height - image.screen_rect.height) / 2
             for i in range(deck_len + 1):
@@ -68,7 +49,7 @@ class PlayerHand(BoardObject):
                 j = i if i < self.insert_image_index else i - 1
                 image = self.deck[j]
                 surface.blit(image.display, (x, y))
-            return surface
+            return
 
         start_x = (self.screen_rect.width - (self.margin * (deck_len - 1) + image.screen_rect.width * deck_len) ) / 2
         start_y = (self.screen_rect.height - image.screen_rect.height) / 2
@@ -77,39 +58,61 @@ class PlayerHand(BoardObject):
             x = start_x + i * self.margin + i * image_width
             y = start_y
             surface.blit(image.display, (x, y))
-        
-        return surface
 
-    @property
-    def display(self):
-        return self.create_display()
+    def find_insert_index(self):
+        """Slot closest to the mouse when a card is held over the hand.
+
+        The slots sit on one row spaced evenly, so the closest one follows
+        from the mouse x alone."""
+        deck_len = len(self.deck)
+        if deck_len == 0:
+            return 0
+        image_original_width = self.deck[0].world_rect.width
+        start_x = (self.world_rect.width - (self.margin * deck_len + image_original_width * (deck_len + 1)) ) / 2
+        first_center_x = self.world_rect.x + start_x + image_original_width / 2
+        mouse_x, _ = self.game.camera.mouse_pos()
+        index = round((mouse_x - first_center_x) / (self.margin + image_original_width))
+        return min(max(index, 0), deck_len)
+
+    def display_inputs(self):
+        # Adding or removing cards and a card's own display changing
+        # invalidate the hand explicitly, see Image.create_display
+        return (self.screen_rect.size, self.is_focused, self.insert_image_index)
+
+    def update(self):
+        self.insert_image_index = self.find_insert_index() if self.is_focused else 0
+        self.refresh_display()
 
     def add_image(self, image, index=None, send_message=True):
         if image not in self.deck:
-            image.render = False
-            self.mark_focused(False)
+            with self.batch():
+                image.render = False
+                self.mark_focused(False)
 
-            if self.owner == self.game.name and not image.is_front:
-                image.flip(False)
-            elif self.owner != self.game.name and image.is_front:
-                image.flip(True)
+                if self.owner == self.game.name and not image.is_front:
+                    image.flip(False)
+                elif self.owner != self.game.name and image.is_front:
+                    image.flip(True)
 
-            if index is None:
-                index = self.insert_image_index
-            self.deck.insert(index, image)
+                if index is None:
+                    index = self.insert_image_index
+                self.deck.insert(index, image)
+                self.invalidate()
 
-            if send_message:
-                self.game.network_mg.add_image_to_hand_send(self, image, index)
+                if send_message:
+                    self.game.network_mg.add_image_to_hand_send(self, image, index)
 
     def remove_image(self, image, send_message=True):
         if image in self.deck:
-            image.render = True
-            if image.is_front:
-                image.flip()
-            self.deck.remove(image)
-
-            if send_message:
-                self.game.network_mg.remove_image_from_hand_send(self, image)
+            with self.batch():
+                image.render = True
+                if image.is_front:
+                    image.flip()
+                self.deck.remove(image)
+                self.invalidate()
+
+                if send_message:
+                    self.game.network_mg.remove_image_from_hand_send(self, image)
 
     def holding(self):
         deck_len = len(self.deck)
@@ -0,0 +1,48 @@
+from bisect import bisect_left
+
+class RenderList:
+    """Rendered sprites kept sorted by (layer, z_index, insertion order).
+
+    The list is updated incrementally whenever a sprite is added, removed,
+    gets a new z index or has its render flag toggled, so neither the
+    renderer nor hit-testing has to sort the whole group again. Iterate it
+    forwards to draw bottom-up and use `reversed` to hit-test top-down."""
+
+    def __init__(self):
+        self.keys = []
+        self.sprites = []
+        self.members = dict()
+
+    def refresh(self, sprite):
+        self.discard(sprite)
+        if sprite.render:
+            key = sprite.order_key()
+            i = bisect_left(self.keys, key)
+            self.keys.insert(i, key)
+            self.sprites.insert(i, sprite)
+            self.members[sprite] = key
+
+    def discard(self, sprite):
+        key = self.members.pop(sprite, None)
+        if key is not None:
+            i = bisect_left(self.keys, key)
+            del self.keys[i]
+            del self.sprites[i]
+
+    def rebuild(self, sprites):
+        entries = sorted((sprite.order_key(), sprite) for sprite in sprites if sprite.render)
+        self.keys = [key for key, _ in entries]
+        self.sprites = [sprite for _, sprite in entries]
+        self.members = {sprite: key for key, sprite in entries}
+
+    def __contains__(self, sprite):
+        return sprite in self.members
+
+    def __iter__(self):
+        return iter(self.sprites)
+
+    def __reversed__(self):
+        return reversed(self.sprites)
+
+    def __len__(self):
+        return len(self.sprites)
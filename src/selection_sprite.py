@@ -13,6 +13,7 @@ class Selection(BoardObject):
         self.r, self.g, self.b = tuple(int(color[i:i+2], 16) for i in (1, 3, 5))
         self.game = game
         self.z_index = 0
+        self.layer = BoardObject.LAYER_OVERLAY
         self.render = False
         self._type = "selection"
         self.rotation = 0
@@ -25,11 +26,15 @@ class Selection(BoardObject):
         self.clickable = False
         self.update()
 
-    def update(self):
-        self.display = self.create_display()
+    def display_inputs(self):
+        scale = self.game.camera.zoom_scale
+        if self.phase == Selection.PHASE_SELECTED:
+            # Follows the selected sprites while they are dragged around
+            return (self.phase, scale, [tuple(sprite.world_rect) for sprite in self])
+        return (self.phase, scale, self.world_start_pos, self.world_end_pos)
 
     def create_display(self):
-        surface = None
+        self.display = None
         scale = self.game.camera.zoom_scale
         world_width = abs(self.world_end_pos[0] - self.world_start_pos[0])
         world_height = abs(self.world_end_pos[1] - self.world_start_pos[1])
@@ -45,7 +50,9 @@ class Selection(BoardObject):
             x = min(self.world_start_pos[0], self.world_end_pos[0])
             y = min(self.world_start_pos[1], self.world_end_pos[1])
             self.world_rect = pygame.rect.Rect(x, y, world_width, world_height)
+            self.geometry_changed()
             self.screen_rect = pygame.rect.Rect(x, y, screen_width, screen_height)
+            self.display = surface
         elif self.phase == Selection.PHASE_SELECTED:
             min_x = min(sprite.world_rect.topleft[0] for sprite in self)
             min_y = min(sprite.world_rect.topleft[1] for sprite in self)
@@ -61,18 +68,16 @@ class Selection(BoardObject):
             self.world_start_pos = (min_x, min_y)
             self.world_end_pos = (max_x, max_y)
             self.world_rect = pygame.rect.Rect(min_x, min_y, max_x - min_x, max_y - min_y)
+            self.geometry_changed()
             scaled_surface = pygame.transform.scale(surface, (width * scale, height * scale))
             self.screen_rect = scaled_surface.get_rect(topleft=(min_x, min_y))
-            return scaled_surface
-        else:
-            return None
-
-        return surface
+            self.display = scaled_surface
 
     def clicked(self):
-        for sprite in self:
-            sprite.clicked()
-            self.game.assign_z_index(sprite)
+        with self.batch():
+            for sprite in self:
+                sprite.clicked()
+                self.game.assign_z_index(sprite)
         self.reset()
 
     def holding(self):
@@ -90,11 +95,12 @@ class Selection(BoardObject):
         rect = pygame.rect.Rect(min_x, min_y, width, height)
         center = rect.center
 
-        for sprite in self:
-            to_x = p[0] - center[0] + sprite.screen_rect.center[0]
-            to_y = p[1] - center[1] + sprite.screen_rect.center[1]
-            self.game.transform_manager.move_sprite_to_centered(sprite, to_x, to_y)
-            self.game.assign_z_index(sprite)
+        with self.batch():
+            for sprite in self:
+                to_x = p[0] - center[0] + sprite.screen_rect.center[0]
+                to_y = p[1] - center[1] + sprite.screen_rect.center[1]
+                self.game.transform_manager.move_sprite_to_centered(sprite, to_x, to_y)
+                self.game.assign_z_index(sprite)
         return self
 
     def mark_focused(self, is_focused):
@@ -109,11 +115,10 @@ class Selection(BoardObject):
     def finish_selection(self):
         self.phase = Selection.PHASE_SELECTED
         self.selected_objects.clear()
-        for sprite in self.game.GIP.get_rendered_objects():
+        for sprite in self.game.sprite_group.rendered_in_rect(self.world_rect):
             if sprite == self or not sprite.draggable:
                 continue
-            elif self.game.collision_manager.colliderect(self.world_rect, sprite.world_rect):
-                self.selected_objects.append(sprite)
+            self.selected_objects.append(sprite)
         if len(self) == 0:
             self.reset()
 
@@ -0,0 +1,65 @@
+import math
+
+class SpatialGrid:
+    """Uniform grid over sprites' world rects.
+
+    Each sprite is registered in every cell its world rect overlaps, so rect
+    queries only look at the cells they cover instead of the whole board."""
+
+    def __init__(self, cell_size=256):
+        self.cell_size = cell_size
+        self.cells = dict()
+        self.sprite_cells = dict()
+
+    def cell_range(self, x, y, width, height):
+        size = self.cell_size
+        return (math.floor(x / size), math.floor(y / size),
+                math.floor((x + max(width, 1) - 1) / size), math.floor((y + max(height, 1) - 1) / size))
+
+    def update(self, sprite):
+        rect = sprite.world_rect
+        new_range = self.cell_range(rect.x, rect.y, rect.width, rect.height)
+        old_range = self.sprite_cells.get(sprite)
+        if old_range == new_range:
+            return
+        if old_range is not None:
+            self._unlink(sprite, old_range)
+        self.sprite_cells[sprite] = new_range
+        x0, y0, x1, y1 = new_range
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), set()).add(sprite)
+
+    def remove(self, sprite):
+        old_range = self.sprite_cells.pop(sprite, None)
+        if old_range is not None:
+            self._unlink(sprite, old_range)
+
+    def _unlink(self, sprite, cell_range):
+        x0, y0, x1, y1 = cell_range
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells[(cx, cy)]
+                cell.discard(sprite)
+                if len(cell) == 0:
+                    del self.cells[(cx, cy)]
+
+    def query(self, x, y, width, height):
+        """Sprites whose cells overlap the rect; callers do the exact test."""
+        x0, y0, x1, y1 = self.cell_range(x, y, width, height)
+        result = set()
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            # Query covers more cells than exist, walk the occupied ones
+            for (cx, cy), cell in self.cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    result.update(cell)
+            return result
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is not None:
+                    result.update(cell)
+        return result
+
+    def __contains__(self, sprite):
+        return sprite in self.sprite_cells
@@ -1,102 +1,143 @@
+import os
+import shutil
+import threading
 import zipfile
 import json
 from src import game as game_module
+from src.columnar_state import ColumnarState
 
 class GameStateManager:
 
+    FORMAT_COLUMNAR = "columnar"
+    FORMAT_JSON = "json"
+    STATE_MEMBERS = {
+        FORMAT_COLUMNAR: "game_state.bin",
+        FORMAT_JSON: "game_state.json",
+    }
+    # Sprites are built in this order so references always resolve
+    BUILD_ORDER = {
+        "image": 0,
+        "holder": 1,
+        "player_hand": 1,
+        "shuffle_button": 2,
+        "retrieve_button": 2,
+        "sit_button": 2,
+        "dice": 2,
+    }
+
     @staticmethod
-    def save_game_state(game, output_zip_path="game_state.zip"):
-        zipf = zipfile.ZipFile(output_zip_path, "w")
-        game_state = []
-        for sprite in game.sprite_group.sprites():
-            if sprite._type == "image":
-                game_state.append({
-                    "type": "image",
-                    "id": sprite._id,
-                    "x": sprite.world_rect.x,
-                    "y": sprite.world_rect.y,
-                    "width": sprite.world_rect.width,
-                    "height": sprite.world_rect.height,
-                    "front_path": sprite.front_image_path,
-                    "z_index": sprite.z_index,
-                    "render": sprite.render,
-                    "flipable": sprite.flipable,
-                    "draggable": sprite.draggable,
-                    "rotatable": sprite.rotatable,
-                    "rotation": sprite.rotation,
-                    "is_front": sprite.is_front,
-                })
-                if sprite.flipable:
-                    game_state[-1]["back_path"] = sprite.back_image_path
-                    zipf.write(sprite.back_image_path, sprite.back_image_path)
-                zipf.write(sprite.front_image_path, sprite.front_image_path)
-        for sprite in game.sprite_group.sprites():
-            if sprite._type == "holder":
-                game_state.append({
-                    "type": "holder",
-                    "id": sprite._id,
-                    "x": sprite.world_rect.x,
-                    "y": sprite.world_rect.y,
-                    "width": sprite.world_rect.width,
-                    "height": sprite.world_rect.height,
-                    "z_index": sprite.z_index,
-                    "deck": [f._id for f in sprite.deck]
-                })
-            elif sprite._type == "player_hand":
-                game_state.append({
-                    "type": "player_hand",
-                    "id": sprite._id,
-                    "x": sprite.world_rect.x,
-                    "y": sprite.world_rect.y,
-                    "width": sprite.world_rect.width,
-                    "height": sprite.world_rect.height
-                })
-        for sprite in game.sprite_group.sprites():
-            if "button" in sprite._type:
-                arr = {
-                    "type": sprite._type,
-                    "id": sprite._id,
-                    "x": sprite.world_rect.x,
-                    "y": sprite.world_rect.y,
-                    "width": sprite.world_rect.width,
-                    "height": sprite.world_rect.height,
-                    "z_index": sprite.z_index,
-                }
-                if sprite._type == "retrieve_button":
-                    arr["holder"] = sprite.deck._id
-                    arr["images_to_retrieve"] = [f._id for f in sprite.images_to_retrieve]
-                elif sprite._type == "shuffle_button":
-                    arr["holder"] = sprite.holder._id
-                elif sprite._type == "sit_button":
-                    arr["hand"] = sprite.hand._id
-                game_state.append(arr)
+    def snapshot(game):
+        """Capture the object table as flat tuples in one pass over the sprites.
+
+        This is the only part of a save that runs on the game thread, so it
+        copies plain values and nothing else (a Rect copy is much cheaper
+        than reading its four fields); `records` turns the rows into the
+        saved records later. Nothing here touches the disk."""
+        rows = []
         for sprite in game.sprite_group.sprites():
-            if sprite._type == "dice":
-                game_state.append({
-                    "type": "dice",
-                    "id": sprite._id,
-                    "x": sprite.world_rect.x,
-                    "y": sprite.world_rect.y,
-                    "width": sprite.world_rect.width,
-                    "height": sprite.world_rect.height,
-                    "z_index": sprite.z_index,
-                    "paths": sprite.paths,
-                    "draggable": sprite.draggable,
-                    "rotatable": sprite.rotatable,
-                    "rotation": sprite.rotation,
+            _type = sprite._type
+            rect = sprite.world_rect.copy()
+            if _type == "image":
+                rows.append((_type, sprite._id, rect, sprite._z_index, sprite._render,
+                             sprite.front_image_path, sprite.back_image_path if sprite.flipable else None,
+                             sprite.draggable, sprite.rotatable, sprite.rotation, sprite.is_front))
+            elif _type == "holder":
+                rows.append((_type, sprite._id, rect, sprite._z_index, [f._id for f in sprite.deck]))
+            elif _type == "player_hand":
+                rows.append((_type, sprite._id, rect))
+            elif _type == "retrieve_button":
+                rows.append((_type, sprite._id, rect, sprite._z_index, sprite.deck._id, [f._id for f in sprite.images_to_retrieve]))
+            elif _type == "shuffle_button":
+                rows.append((_type, sprite._id, rect, sprite._z_index, sprite.holder._id))
+            elif _type == "sit_button":
+                rows.append((_type, sprite._id, rect, sprite._z_index, sprite.hand._id))
+            elif _type == "dice":
+                rows.append((_type, sprite._id, rect, sprite._z_index, list(sprite.paths),
+                             sprite.draggable, sprite.rotatable, sprite.rotation))
+        return rows
+
+    @staticmethod
+    def records(rows):
+        """Serializable records for snapshot rows, and the asset paths they
+        reference, each path listed once."""
+        game_state = []
+        asset_paths = dict()
+        for row in rows:
+            _type, _id, rect = row[:3]
+            record = {"type": _type, "id": _id, "x": rect.x, "y": rect.y, "width": rect.width, "height": rect.height}
+            if _type == "image":
+                z_index, render, front_path, back_path, draggable, rotatable, rotation, is_front = row[3:]
+                record.update({
+                    "front_path": front_path,
+                    "z_index": z_index,
+                    "render": render,
+                    "flipable": back_path is not None,
+                    "draggable": draggable,
+                    "rotatable": rotatable,
+                    "rotation": rotation,
+                    "is_front": is_front,
                 })
-                for p in sprite.paths:
-                    zipf.write(p, p)
-        zipf.writestr("game_state.json", json.dumps(game_state, indent=2))
+                asset_paths[front_path] = None
+                if back_path is not None:
+                    record["back_path"] = back_path
+                    asset_paths[back_path] = None
+            elif _type == "holder":
+                record["z_index"], record["deck"] = row[3:]
+            elif _type == "retrieve_button":
+                record["z_index"], record["holder"], record["images_to_retrieve"] = row[3:]
+            elif _type == "shuffle_button":
+                record["z_index"], record["holder"] = row[3:]
+            elif _type == "sit_button":
+                record["z_index"], record["hand"] = row[3:]
+            elif _type == "dice":
+                record["z_index"], record["paths"], record["draggable"], record["rotatable"], record["rotation"] = row[3:]
+                for p in record["paths"]:
+                    asset_paths[p] = None
+            game_state.append(record)
+        return game_state, list(asset_paths)
+
+    @staticmethod
+    def save_game_state(game, output_zip_path="game_state.zip", background=False, state_format=FORMAT_COLUMNAR):
+        """Save the board. With `background` only the snapshot is taken on
+        the calling thread and the archive is written by the game's SaveWorker."""
+        rows = GameStateManager.snapshot(game)
+        if background:
+            game.save_worker.submit(output_zip_path, rows, state_format)
+        else:
+            game.save_worker.write(output_zip_path, rows, state_format)
+
+    @staticmethod
+    def export_json(game, output_zip_path="game_state_json.zip", background=False):
+        GameStateManager.save_game_state(game, output_zip_path, background, GameStateManager.FORMAT_JSON)
 
     @staticmethod
-    def load_game_state(game, input_zip_path="game_state.zip"):
-        zipf = zipfile.ZipFile(input_zip_path, "r")
-        zipf.extractall()
-        with open("game_state.json", 'r') as file:
-            game_state = json.load(file)
-        for sprite in game_state:
-            if sprite["type"] == "image":
+    def encode_game_state(game_state, state_format):
+        if state_format == GameStateManager.FORMAT_COLUMNAR:
+            return ColumnarState.encode(game_state)
+        return json.dumps(game_state, separators=(",", ":"))
+
+    @staticmethod
+    def load_game_state(game, source="game_state.zip"):
+        """Load a game from a zip path or from the zip's raw bytes.
+
+        The archive is mounted into the game's asset manager, so images are
+        decoded from its members on demand instead of being extracted. A
+        columnar state is preferred over JSON when the archive has both."""
+        zipf = game.assets.mount_archive(source)
+        columnar_member = GameStateManager.STATE_MEMBERS[GameStateManager.FORMAT_COLUMNAR]
+        if columnar_member in zipf.NameToInfo:
+            game_state = ColumnarState.decode(game.assets.map_member(zipf, columnar_member))
+        else:
+            game_state = json.loads(zipf.read(GameStateManager.STATE_MEMBERS[GameStateManager.FORMAT_JSON]))
+        # Textures are decoded in the background, sprites start with placeholders
+        with game.asset_loader.progressive(), game.batch():
+            GameStateManager.build_game_state(game, game_state)
+
+    @staticmethod
+    def build_game_state(game, game_state):
+        for sprite in sorted(game_state, key=lambda record: GameStateManager.BUILD_ORDER[record["type"]]):
+            _type = sprite["type"]
+            if _type == "image":
                 if sprite["flipable"]:
                     image = game_module.Image(sprite["front_path"], sprite["x"], sprite["y"], sprite["width"], sprite["height"], game.sprite_group, game, flipable=True, back_path=sprite["back_path"])
                 else:
@@ -110,25 +151,22 @@ class GameStateManager:
                 image.is_front = sprite["is_front"]
                 game.mp[image._id] = image
                 image.update()
-        for sprite in game_state:
-            if sprite["type"] == "holder":
+            elif _type == "holder":
                 holder = game_module.Holder(sprite["x"], sprite["y"], sprite["width"], sprite["height"], game.sprite_group, game)
                 holder.z_index = sprite["z_index"]
                 holder._id = sprite["id"]
-                for image_id in sprite["deck"]:
-                    holder.add_image(game.mp[image_id], False)
+                holder.add_images([game.mp[image_id] for image_id in sprite["deck"]], False)
                 game.mp[holder._id] = holder
-            elif sprite["type"] == "player_hand":
+            elif _type == "player_hand":
                 hand = game_module.PlayerHand(sprite["x"], sprite["y"], sprite["width"], sprite["height"], game.sprite_group, game)
                 hand._id = sprite["id"]
                 game.mp[hand._id] = hand
-        for sprite in game_state:
-            if sprite["type"] == "shuffle_button":
+            elif _type == "shuffle_button":
                 button = game_module.ShuffleButton(game.sprite_group, game, sprite["x"], sprite["y"], sprite["width"], sprite["height"], game.mp[sprite["holder"]])
                 button.z_index = sprite["z_index"]
                 button._id = sprite["id"]
                 game.mp[button._id] = button
-            elif sprite["type"] == "retrieve_button":
+            elif _type == "retrieve_button":
                 images_to_retrieve = []
                 for image_id in sprite["images_to_retrieve"]:
                     images_to_retrieve.append(game.mp[image_id])
@@ -136,12 +174,12 @@ class GameStateManager:
                 button.z_index = sprite["z_index"]
                 button._id = sprite["id"]
                 game.mp[button._id] = button
-            elif sprite["type"] == "sit_button":
+            elif _type == "sit_button":
                 button = game_module.SitButton(game.sprite_group, game, sprite["x"], sprite["y"], sprite["width"], sprite["height"], game.mp[sprite["hand"]])
                 button.z_index = sprite["z_index"]
                 button._id = sprite["id"]
                 game.mp[button._id] = button
-            elif sprite["type"] == "dice":
+            elif _type == "dice":
                 dice = game_module.Dice(sprite["paths"], sprite["x"], sprite["y"], sprite["width"], sprite["height"], game.sprite_group, game)
                 dice.z_index = sprite["z_index"]
                 dice._id = sprite["id"]
@@ -152,3 +190,87 @@ class GameStateManager:
                 dice.update()
         game.initialize_z_index()
 
+
+class SaveWorker:
+    """Writes game archives on a background thread.
+
+    Only the newest pending snapshot is kept, so autosaves never queue up
+    behind a slow disk. Assets are streamed into the archive one at a time,
+    copied from the previous save when the source member's CRC is unchanged
+    so the mounted archives the loader threads read from are left alone, and
+    PNGs are stored rather than deflated again since they are already
+    compressed."""
+
+    def __init__(self, assets):
+        self.assets = assets
+        self.pending = None
+        self.writing = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, output_zip_path, rows, state_format):
+        with self.condition:
+            self.pending = (output_zip_path, rows, state_format)
+            self.condition.notify()
+
+    def is_busy(self):
+        with self.condition:
+            return self.writing or self.pending is not None
+
+    def wait(self):
+        with self.condition:
+            while self.writing or self.pending is not None:
+                self.condition.wait()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                job = self.pending
+                self.pending = None
+                self.writing = True
+            try:
+                self.write(*job)
+            except (OSError, zipfile.BadZipFile) as e:
+                print(f"Failed to save game state: {e}")
+            finally:
+                with self.condition:
+                    self.writing = False
+                    self.condition.notify_all()
+
+    @staticmethod
+    def previous_archive(output_zip_path):
+        try:
+            return zipfile.ZipFile(output_zip_path, "r")
+        except (OSError, zipfile.BadZipFile):
+            return None
+
+    def copy_asset(self, zipf, previous, path):
+        archive = self.assets.find_archive(path)
+        source = None
+        if previous is not None and archive is not None and path in previous.NameToInfo:
+            if previous.getinfo(path).CRC == archive.getinfo(path).CRC:
+                source = previous.open(path)
+        if source is None:
+            source = self.assets.open(path)
+        with source, zipf.open(path, "w") as target:
+            shutil.copyfileobj(source, target)
+
+    def write(self, output_zip_path, rows, state_format):
+        temp_path = output_zip_path + ".tmp"
+        game_state, asset_paths = GameStateManager.records(rows)
+        encoded = GameStateManager.encode_game_state(game_state, state_format)
+        # The columnar state is stored uncompressed so it can be memory-mapped
+        compression = zipfile.ZIP_STORED if state_format == GameStateManager.FORMAT_COLUMNAR else zipfile.ZIP_DEFLATED
+        previous = SaveWorker.previous_archive(output_zip_path)
+        try:
+            with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_STORED) as zipf:
+                for path in asset_paths:
+                    self.copy_asset(zipf, previous, path)
+                zipf.writestr(GameStateManager.STATE_MEMBERS[state_format], encoded, compression)
+        finally:
+            if previous is not None:
+                previous.close()
+        os.replace(temp_path, output_zip_path)
@@ -0,0 +1,102 @@
+import mmap
+import os
+import threading
+
+from collections import OrderedDict
+
+class SurfaceCache:
+    """Scaled surfaces kept on disk between sessions.
+
+    Every entry is a raw RGBA file named after the asset's content hash, the
+    target size and the rotation, so it can be memory-mapped and handed to
+    `pygame.image.frombuffer` without decoding anything. Reads refresh the
+    file's mtime, and the least recently used files are deleted once the
+    directory grows past `max_bytes`."""
+
+    DEFAULT_DIRECTORY = ".surface_cache"
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+    SUFFIX = ".rgba"
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.scan()
+
+    def scan(self):
+        files = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(SurfaceCache.SUFFIX) and entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self.entries[name] = size
+            self.bytes_used += size
+        self.evict()
+
+    @staticmethod
+    def entry_name(content_hash, width, height, rotation=0):
+        return f"{content_hash}_{width}x{height}_{rotation % 360}{SurfaceCache.SUFFIX}"
+
+    def load(self, content_hash, width, height, rotation=0):
+        """Memory-mapped RGBA pixels for the entry, or None on a miss."""
+        name = SurfaceCache.entry_name(content_hash, width, height, rotation)
+        with self.lock:
+            if name not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(name)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size != width * height * 4:
+                    raise OSError("truncated cache entry")
+                pixels = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.discard(name)
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return pixels
+
+    def store(self, content_hash, width, height, pixels, rotation=0):
+        name = SurfaceCache.entry_name(content_hash, width, height, rotation)
+        path = os.path.join(self.directory, name)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(pixels)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Failed to cache {name}: {e}")
+            return
+        with self.lock:
+            self.bytes_used += len(pixels) - self.entries.pop(name, 0)
+            self.entries[name] = len(pixels)
+            self.evict()
+
+    def discard(self, name):
+        with self.lock:
+            self.bytes_used -= self.entries.pop(name, 0)
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+    def evict(self):
+        while self.bytes_used > self.max_bytes and len(self.entries) > 0:
+            name, size = self.entries.popitem(last=False)
+            self.bytes_used -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
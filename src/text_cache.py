@@ -0,0 +1,16 @@
+import pygame
+
+from functools import lru_cache
+
+class TextCache:
+    """Fonts and rendered strings shared by every sprite that draws text."""
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def font(size):
+        return pygame.font.Font(None, size)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def render(text, size, color):
+        return TextCache.font(size).render(text, True, color)
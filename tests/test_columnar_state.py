@@ -0,0 +1,67 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+
+from src.columnar_state import ColumnarState
+
+def image(_id, rotation, back_path=None, **fields):
+    record = {"type": "image", "id": _id, "x": -40, "y": 25, "width": 100, "height": 140, "z_index": _id,
+              "front_path": "cards/front.png", "render": True, "flipable": back_path is not None,
+              "draggable": True, "rotatable": True, "is_front": back_path is None, "rotation": rotation}
+    if back_path is not None:
+        record["back_path"] = back_path
+    record.update(fields)
+    return record
+
+GAME_STATE = [
+    image(1, 0),
+    image(2, 90, "cards/back.png"),
+    image(3, 180, "cards/back.png", is_front=True, render=False),
+    image(4, 270, "cards/other back.png", draggable=False, rotatable=False, z_index=2 ** 40),
+    {"type": "holder", "id": 5, "x": 0, "y": 0, "width": 120, "height": 160, "z_index": 7, "deck": [2, 3]},
+    {"type": "holder", "id": 6, "x": 10, "y": 0, "width": 120, "height": 160, "z_index": 8, "deck": []},
+    {"type": "player_hand", "id": 7, "x": 0, "y": 500, "width": 800, "height": 200},
+    {"type": "shuffle_button", "id": 8, "x": 0, "y": -30, "width": 60, "height": 20, "z_index": 9, "holder": 5},
+    {"type": "retrieve_button", "id": 9, "x": 70, "y": -30, "width": 60, "height": 20, "z_index": 10,
+     "holder": 5, "images_to_retrieve": [1, 2, 3]},
+    {"type": "sit_button", "id": 10, "x": 0, "y": 480, "width": 60, "height": 20, "z_index": 11, "hand": 7},
+    {"type": "dice", "id": 11, "x": 300, "y": 300, "width": 50, "height": 50, "z_index": 12,
+     "paths": ["dice/1.png", "dice/2.png", "cards/front.png"], "draggable": True, "rotatable": False, "rotation": 90},
+]
+
+def test_round_trip():
+    assert ColumnarState.decode(ColumnarState.encode(GAME_STATE)) == GAME_STATE
+
+def test_round_trip_from_memoryview():
+    encoded = bytearray(ColumnarState.encode(GAME_STATE))
+    assert ColumnarState.decode(memoryview(encoded)) == GAME_STATE
+
+def test_empty_state():
+    assert ColumnarState.decode(ColumnarState.encode([])) == []
+
+def test_strings_are_stored_once():
+    columns = ColumnarState.columns(ColumnarState.encode(GAME_STATE))
+    assert sorted(columns["strings"]) == ["cards/back.png", "cards/front.png", "cards/other back.png", "dice/1.png", "dice/2.png"]
+
+def with_header(encoded, magic=ColumnarState.MAGIC, version=ColumnarState.VERSION):
+    encoded = bytearray(encoded)
+    _, _, reserved, count, string_count, list_count = ColumnarState.HEADER.unpack_from(encoded, 0)
+    ColumnarState.HEADER.pack_into(encoded, 0, magic, version, reserved, count, string_count, list_count)
+    return bytes(encoded)
+
+def test_newer_version_is_rejected():
+    encoded = with_header(ColumnarState.encode(GAME_STATE), version=ColumnarState.VERSION + 1)
+    with pytest.raises(ValueError, match="version"):
+        ColumnarState.decode(encoded)
+
+def test_current_version_is_accepted():
+    encoded = with_header(ColumnarState.encode(GAME_STATE), version=ColumnarState.VERSION)
+    assert ColumnarState.decode(encoded) == GAME_STATE
+
+def test_wrong_magic_is_rejected():
+    encoded = with_header(ColumnarState.encode(GAME_STATE), magic=b"PK\x03\x04")
+    with pytest.raises(ValueError):
+        ColumnarState.decode(encoded)
@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.deck import Deck
+
+class Card:
+    def __init__(self, _id):
+        self._id = _id
+
+def ids(images):
+    return [image._id for image in images]
+
+# Every client has to produce exactly these, changing them means bumping
+# Deck.SHUFFLE_VERSION
+def test_permutation_is_pinned():
+    assert Deck.permutation(10, 0) == [6, 3, 2, 9, 8, 1, 4, 7, 0, 5]
+    assert Deck.permutation(10, 12345) == [8, 6, 7, 2, 1, 3, 9, 5, 0, 4]
+    assert Deck.permutation(10, 2 ** 63 - 1) == [7, 1, 2, 5, 4, 6, 3, 8, 0, 9]
+
+def test_permutation_follows_splitmix64():
+    # The first swap puts index (first splitmix64 output % n) last, and no
+    # later swap touches the last slot; 0xE220A8397B1DCDAF is the first
+    # output for seed 0
+    assert Deck.permutation(1000, 0)[-1] == 0xE220A8397B1DCDAF % 1000
+
+def test_permutation_is_a_permutation():
+    for n in (0, 1, 2, 52, 500):
+        assert sorted(Deck.permutation(n, 99)) == list(range(n))
+
+def test_seeds_are_taken_modulo_2_64():
+    assert Deck.permutation(20, -1) == Deck.permutation(20, 2 ** 64 - 1)
+    assert Deck.permutation(20, 2 ** 64 + 5) == Deck.permutation(20, 5)
+
+def test_seeded_order_ignores_local_order():
+    cards = [Card(i) for i in (5, 3, 9, 1)]
+    a = Deck(cards)
+    b = Deck(reversed(cards))
+    assert ids(a.seeded_order(42)) == ids(b.seeded_order(42)) == [5, 1, 9, 3]
+
+def test_seeded_order_depends_on_seed():
+    deck = Deck(Card(i) for i in range(52))
+    assert ids(deck.seeded_order(1)) != ids(deck.seeded_order(2))
+    assert ids(deck.seeded_order(1)) == ids(deck.seeded_order(1))
+
+def test_checksum_is_pinned():
+    assert Deck(Card(i) for i in (5, 3, 9, 1)).checksum() == 1483339677
+    assert Deck().checksum() == 0
+
+def test_checksum_follows_order():
+    cards = [Card(i) for i in range(10)]
+    deck = Deck(cards)
+    shuffled = Deck(deck.seeded_order(7))
+    assert deck.checksum() != shuffled.checksum()
+    assert shuffled.checksum() == Deck(deck.seeded_order(7)).checksum()
@@ -0,0 +1,74 @@
+import os
+import sys
+import types
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+pygame.init()
+pygame.display.set_mode((64, 64))
+
+from src.board_object import BoardObject
+from src.game import Game, SpriteGroup
+from src.network_manager import NetworkManager
+
+class Card(BoardObject):
+    def __init__(self, group, _id):
+        super().__init__(group)
+        self._id = _id
+        self.world_rect = pygame.Rect(0, 0, 10, 10)
+        self.geometry_changed()
+        self.render = True
+
+def make_client(ids):
+    group = SpriteGroup()
+    game = types.SimpleNamespace(sprite_group=group, z_index_iota=0,
+                                 mp={_id: Card(group, _id) for _id in ids},
+                                 transform_manager=types.SimpleNamespace(move_sprite_to=lambda obj, x, y: None))
+    game.set_z_index = lambda obj, z_index: Game.set_z_index(game, obj, z_index)
+    network = types.SimpleNamespace(game=game, networking_status=True)
+    return game, network
+
+def connect(a, b):
+    a[1].send_udp = lambda message: NetworkManager.move_object_received(b[1], message)
+    b[1].send_udp = lambda message: NetworkManager.move_object_received(a[1], message)
+
+def raise_object(client, _id):
+    game, network = client
+    obj = game.mp[_id]
+    Game.assign_z_index(game, obj)
+    NetworkManager.move_object_send(network, obj)
+
+def stacking(client):
+    return [sprite._id for sprite in client[0].sprite_group.render_list]
+
+def test_clients_agree_on_stacking_order():
+    ids = ["x", "y", "z"]
+    a, b = make_client(ids), make_client(ids)
+    connect(a, b)
+
+    # Far more raises than there are objects, then one raise of another
+    # object and one from the other client
+    for _ in range(5000):
+        raise_object(a, "x")
+    raise_object(a, "y")
+    assert stacking(a) == stacking(b) == ["z", "x", "y"]
+
+    raise_object(b, "z")
+    raise_object(a, "x")
+    assert stacking(a) == stacking(b) == ["y", "z", "x"]
+    assert a[0].z_index_iota == b[0].z_index_iota
+
+def test_draw_order_matches_hit_test():
+    game, _ = make_client(["x", "y"])
+    for _ in range(100):
+        Game.assign_z_index(game, game.mp["x"])
+    Game.assign_z_index(game, game.mp["y"])
+
+    group = game.sprite_group
+    drawn = group.rendered_in_rect(pygame.Rect(0, 0, 10, 10))
+    hit = group.rendered_at(5, 5)
+    assert [sprite._id for sprite in drawn] == ["x", "y"]
+    assert drawn == list(reversed(hit))